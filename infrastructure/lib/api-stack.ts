@@ -169,6 +169,10 @@ export class ApiStack extends BaseStack {
         // POST /api/chat - Send a message
         chatResource.addMethod('POST', new apigateway.LambdaIntegration(chatFunction));
 
+        // POST /api/chat/batch - Send several messages, processed in order
+        const chatBatchResource = chatResource.addResource('batch');
+        chatBatchResource.addMethod('POST', new apigateway.LambdaIntegration(chatFunction));
+
         // GET /api/chat/history/{customerId} - Get chat history
         const chatHistoryResource = chatResource.addResource('history');
         const chatHistoryCustomerResource = chatHistoryResource.addResource('{customerId}');
@@ -77,6 +77,11 @@ def get_cors_headers(event=None):
 # For backward compatibility
 CORS_HEADERS = get_cors_headers()
 
+# Maximum number of messages accepted by a single batch request. This bounds
+# the request size only: messages are processed one model call at a time, so
+# a long batch can still exceed the API Gateway integration timeout
+MAX_BATCH_MESSAGES = 10
+
 def handle_chat_message(customer_id: str, message_text: str, event=None, conversation_id: Optional[str] = None) -> Dict[str, Any]:
     """
     Handle a chat message from a customer.
@@ -176,6 +181,47 @@ def handle_chat_message(customer_id: str, message_text: str, event=None, convers
             'body': json.dumps({'error': f"Error processing message: {str(e)}"})
         }
 
+def handle_chat_batch(customer_id: str, messages: List[str], event=None, conversation_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Handle a batch of chat messages from a customer.
+    
+    Messages are processed in order exactly as if each had been sent to the
+    chat endpoint, so later messages see the device state left by earlier
+    ones. Processing stops at the first message that fails, and that
+    message's error response is returned.
+    
+    Args:
+        customer_id: The ID of the customer sending the messages
+        messages: The texts of the messages, in order
+        event: The Lambda event (optional, for CORS headers)
+        conversation_id: The ID of the conversation (optional)
+        
+    Returns:
+        API Gateway response
+    """
+    # Get CORS headers based on the request origin
+    cors_headers = get_cors_headers(event)
+    
+    logger.info(f"[CHAT_BATCH] Processing {len(messages)} messages from customer {customer_id}")
+    
+    results = []
+    for index, message_text in enumerate(messages):
+        response = handle_chat_message(customer_id, message_text, event, conversation_id)
+        if response['statusCode'] != 200:
+            logger.error(f"[CHAT_BATCH] Message {index} failed with status {response['statusCode']}")
+            return response
+        results.append(json.loads(response['body']))
+    
+    logger.info(f"[CHAT_BATCH] Batch processing completed for customer {customer_id}")
+    return {
+        'statusCode': 200,
+        'headers': cors_headers,
+        'body': json.dumps({
+            'customerId': customer_id,
+            'results': results
+        })
+    }
+
 def handle_chat_history(customer_id: str, event=None, conversation_id: Optional[str] = None) -> Dict[str, Any]:
     """
     Get chat history for a customer.
@@ -35,8 +35,10 @@ import utils
 # Import handlers
 from handlers.chat_handler import (
     handle_chat_message,
+    handle_chat_batch,
     handle_chat_history,
-    CORS_HEADERS
+    CORS_HEADERS,
+    MAX_BATCH_MESSAGES
 )
 
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
@@ -100,6 +102,40 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 
                 return handle_chat_message(customer_id, message, event, conversation_id)
         
+        elif path == '/api/chat/batch':
+            if http_method == 'POST':
+                # Parse request body
+                body = json.loads(event.get('body', '{}'))
+                customer_id = body.get('customerId')
+                messages = body.get('messages')
+                conversation_id = body.get('conversationId')  # Extract conversationId if provided
+                
+                if not customer_id or not isinstance(messages, list) or not messages \
+                        or not all(isinstance(message, str) for message in messages):
+                    return {
+                        'statusCode': 400,
+                        'headers': CORS_HEADERS,
+                        'body': json.dumps({'error': 'Missing customerId or messages'})
+                    }
+                
+                # Reject blank messages before any message is processed, so a
+                # batch never stops partway because of its own contents
+                if not all(message.strip() for message in messages):
+                    return {
+                        'statusCode': 400,
+                        'headers': CORS_HEADERS,
+                        'body': json.dumps({'error': 'Empty messages are not allowed'})
+                    }
+                
+                if len(messages) > MAX_BATCH_MESSAGES:
+                    return {
+                        'statusCode': 400,
+                        'headers': CORS_HEADERS,
+                        'body': json.dumps({'error': f'At most {MAX_BATCH_MESSAGES} messages are allowed per batch'})
+                    }
+                
+                return handle_chat_batch(customer_id, messages, event, conversation_id)
+        
         # If no matching route, return 404
         return {
             'statusCode': 404,
@@ -0,0 +1,115 @@
+"""
+Unit tests for the chat batch endpoint.
+
+This module contains tests for handle_chat_batch and for the request
+validation done by the Lambda entry point before a batch is processed.
+"""
+
+import unittest
+import sys
+import os
+import json
+import logging
+from unittest.mock import patch
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Add the parent directory to sys.path to enable imports
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(os.path.dirname(current_dir))
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+# Import the modules to test
+import index
+from handlers.chat_handler import handle_chat_batch, MAX_BATCH_MESSAGES
+
+
+def batch_event(body):
+    """Build a POST /api/chat/batch event with the given JSON body."""
+    return {
+        'path': '/api/chat/batch',
+        'httpMethod': 'POST',
+        'body': json.dumps(body)
+    }
+
+
+class TestHandleChatBatch(unittest.TestCase):
+    """Tests for processing a batch of chat messages."""
+
+    @patch('handlers.chat_handler.process_request')
+    def test_messages_processed_in_order(self, mock_process_request):
+        """Test that each message is processed in order and its result returned."""
+        mock_process_request.side_effect = lambda customer_id, message_data, connection_id: {
+            'message': f"Reply to {message_data['message']}"
+        }
+
+        response = handle_chat_batch('cust_1', ['first', 'second', 'third'])
+
+        self.assertEqual(response['statusCode'], 200)
+        processed = [call.args[1]['message'] for call in mock_process_request.call_args_list]
+        self.assertEqual(processed, ['first', 'second', 'third'])
+        body = json.loads(response['body'])
+        self.assertEqual(body['customerId'], 'cust_1')
+        self.assertEqual([result['message'] for result in body['results']],
+                         ['Reply to first', 'Reply to second', 'Reply to third'])
+
+    @patch('handlers.chat_handler.process_request')
+    def test_stops_on_first_failure(self, mock_process_request):
+        """Test that processing stops at the first failing message."""
+        mock_process_request.side_effect = [
+            {'message': 'ok'},
+            {'error': 'Device is unavailable'},
+            {'message': 'never reached'}
+        ]
+
+        response = handle_chat_batch('cust_1', ['first', 'second', 'third'])
+
+        self.assertEqual(response['statusCode'], 500)
+        self.assertEqual(json.loads(response['body'])['error'], 'Device is unavailable')
+        self.assertEqual(mock_process_request.call_count, 2)
+
+
+class TestChatBatchValidation(unittest.TestCase):
+    """Tests for the batch request validation in the Lambda handler."""
+
+    @patch('index.handle_chat_batch')
+    def test_too_many_messages_rejected(self, mock_handle_chat_batch):
+        """Test that a batch over the message cap is rejected."""
+        messages = ['Turn on the speaker'] * (MAX_BATCH_MESSAGES + 1)
+
+        response = index.handler(batch_event({'customerId': 'cust_1', 'messages': messages}), None)
+
+        self.assertEqual(response['statusCode'], 400)
+        mock_handle_chat_batch.assert_not_called()
+
+    @patch('index.handle_chat_batch')
+    def test_messages_must_be_a_list(self, mock_handle_chat_batch):
+        """Test that a non-list messages field is rejected."""
+        response = index.handler(batch_event({'customerId': 'cust_1', 'messages': 'Turn on the speaker'}), None)
+
+        self.assertEqual(response['statusCode'], 400)
+        mock_handle_chat_batch.assert_not_called()
+
+    @patch('index.handle_chat_batch')
+    def test_messages_must_be_strings(self, mock_handle_chat_batch):
+        """Test that a batch containing a non-string message is rejected."""
+        response = index.handler(batch_event({'customerId': 'cust_1', 'messages': ['Turn on the speaker', 42]}), None)
+
+        self.assertEqual(response['statusCode'], 400)
+        mock_handle_chat_batch.assert_not_called()
+
+    @patch('index.handle_chat_batch')
+    def test_blank_message_rejected_before_processing(self, mock_handle_chat_batch):
+        """Test that a blank message rejects the whole batch before any message is processed."""
+        response = index.handler(batch_event({'customerId': 'cust_1', 'messages': ['Turn on the speaker', '   ']}), None)
+
+        self.assertEqual(response['statusCode'], 400)
+        self.assertEqual(json.loads(response['body'])['error'], 'Empty messages are not allowed')
+        mock_handle_chat_batch.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
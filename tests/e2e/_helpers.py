@@ -0,0 +1,108 @@
+"""
+Shared helpers for the end-to-end API tests.
+"""
+
+import os
+import re
+from typing import Any, Callable, Dict, cast
+
+import fastjsonschema
+import orjson
+import requests
+
+# Headers for request bodies sent pre-encoded with data=
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# (connect, read) timeouts in seconds for chat requests; the read timeout covers
+# the model call behind each chat message
+CHAT_TIMEOUT = (
+    float(os.environ.get("AGENTIC_E2E_CONNECT_TIMEOUT", "3")),
+    float(os.environ.get("AGENTIC_E2E_RESPONSE_TIMEOUT", "30"))
+)
+
+# Negated power-on phrasings ("not on", "isn't currently on", "no longer on"),
+# removed before looking for the word "on"
+NEGATED_ON_RE = re.compile(
+    r"(?:\bnot|n['’]t|\bno longer)(?:\s+(?:currently|still|yet|turned|switched|powered))*\s+on\b",
+    re.IGNORECASE
+)
+POWER_ON_RE = re.compile(r"\bon\b")
+
+
+def check_status(response: requests.Response, expected: int) -> None:
+    """
+    Assert that a response has the expected status code.
+
+    A 502 Bad Gateway is a known issue with the current API deployment, so
+    it fails the test with a short message naming the request. Failures are
+    raised as AssertionError, so run_api_tests.py records them like any
+    other failed assertion.
+
+    Args:
+        response: The API response to check
+        expected: The status code the test expects
+    """
+    if response.status_code == 502:
+        raise AssertionError(f"{response.request.method} {response.url} returned 502 Bad Gateway (known issue)")
+    assert response.status_code == expected, \
+        f"Expected status code {expected}, got {response.status_code}: {response.text}"
+
+
+def response_json(response: requests.Response) -> Any:
+    """
+    Parse a response body with orjson.
+
+    Args:
+        response: The API response to parse
+
+    Returns:
+        The decoded JSON body
+    """
+    return orjson.loads(response.content)
+
+
+def schema_validator(schema: Dict[str, Any]) -> Callable[[Any], None]:
+    """
+    Compile a JSON schema into a validator for response bodies.
+
+    The schema is compiled once, so modules should build their validators
+    at import time and reuse them across tests.
+
+    Args:
+        schema: The JSON schema the body must match
+
+    Returns:
+        A function that raises AssertionError when a body does not match the schema
+    """
+    validate = cast(Callable[[Any], Any], fastjsonschema.compile(schema))
+
+    def check(data: Any) -> None:
+        try:
+            validate(data)
+        except fastjsonschema.JsonSchemaValueException as e:
+            raise AssertionError(f"Response does not match schema: {e.message}") from None
+
+    return check
+
+
+def says_power_on(message: str) -> bool:
+    """
+    Check whether a chat reply says the device is on.
+
+    Negated phrasings such as "isn't on" or "is no longer on" do not count.
+
+    Args:
+        message: The chat reply to check
+
+    Returns:
+        True if the reply mentions "on" outside a negation
+    """
+    return POWER_ON_RE.search(NEGATED_ON_RE.sub("", message)) is not None
+
+
+# Error responses carry a human-readable message under 'error'
+validate_error = schema_validator({
+    "type": "object",
+    "required": ["error"],
+    "properties": {"error": {"type": "string"}}
+})
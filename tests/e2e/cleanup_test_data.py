@@ -10,12 +10,14 @@ import os
 import sys
 import boto3
 import argparse
+from boto3.dynamodb.conditions import Key
 from pathlib import Path
 
 # DynamoDB configuration
 REGION = "us-west-2"  # Same region as the API
 CUSTOMERS_TABLE = "dev-customers"  # Table name
 MESSAGES_TABLE = "dev-messages"  # Messages table name
+MESSAGES_USER_INDEX = "UserIdIndex"  # Messages GSI keyed by userId (the customer ID)
 
 def print_separator():
     """Print a separator line."""
@@ -100,21 +102,31 @@ def delete_customer_messages(dynamodb, customer_id):
     try:
         table = dynamodb.Table(MESSAGES_TABLE)
         
-        # Query for messages with the customer ID
-        response = table.scan(
-            FilterExpression="customerId = :customerId",
-            ExpressionAttributeValues={
-                ":customerId": customer_id
-            }
-        )
-        
+        # Query the customer's partition of the userId index, following
+        # pagination, instead of scanning the whole table; only the table key
+        # is needed to delete each message, so the message text is not fetched
+        query_args = {
+            'IndexName': MESSAGES_USER_INDEX,
+            'KeyConditionExpression': Key('userId').eq(customer_id),
+            'ProjectionExpression': 'conversationId, #ts',
+            'ExpressionAttributeNames': {'#ts': 'timestamp'}
+        }
+        response = table.query(**query_args)
         items = response.get('Items', [])
+        while 'LastEvaluatedKey' in response:
+            response = table.query(ExclusiveStartKey=response['LastEvaluatedKey'], **query_args)
+            items.extend(response.get('Items', []))
+        
         deleted_count = 0
         
-        # Delete each message
-        for item in items:
-            if 'id' in item:
-                table.delete_item(Key={'id': item['id']})
+        # Delete the messages in batches of up to 25 per request; the batch
+        # writer resends any unprocessed items itself
+        with table.batch_writer() as batch:
+            for item in items:
+                batch.delete_item(Key={
+                    'conversationId': item['conversationId'],
+                    'timestamp': item['timestamp']
+                })
                 deleted_count += 1
         
         print(f"✅ Deleted {deleted_count} messages for customer: {customer_id}")
@@ -9,24 +9,65 @@ import sys
 import boto3
 import uuid
 import pytest
-from datetime import datetime
+import requests
+from botocore.config import Config
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from datetime import datetime, timedelta
 from pathlib import Path
 
 # Add the project root to the Python path so that imports work correctly
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
+# The chat endpoint probe uses the chat request timeouts, so a cold start is
+# not mistaken for an outage
+from tests.e2e._helpers import CHAT_TIMEOUT
+
+# Set environment variables for testing, once for every test module
+os.environ["ENVIRONMENT"] = "test"
+
+# REST API under test, matching the test modules
+REST_API_URL = "https://k4w64ym45e.execute-api.us-west-2.amazonaws.com/dev/api"
+
 # DynamoDB configuration
 REGION = "us-west-2"  # Same region as the API
 CUSTOMERS_TABLE = "dev-customers"  # Table name
+# Optional DynamoDB endpoint override (e.g. http://localhost:8000 for DynamoDB
+# Local); must point at the same store the API under test reads from
+DYNAMODB_ENDPOINT_URL = os.environ.get("DYNAMODB_ENDPOINT_URL")
+
+# Shared botocore configuration: adaptive retries, a connection pool large
+# enough for parallel test runs, and TCP keepalive between sporadic calls
+DYNAMODB_CONFIG = Config(
+    retries={'mode': 'adaptive', 'max_attempts': 5},
+    max_pool_connections=50,
+    tcp_keepalive=True
+)
+
+# DynamoDB resource shared by every test in the process
+_dynamodb_resource = None
 
 def create_dynamodb_client():
-    """Create a DynamoDB client."""
-    try:
-        return boto3.resource('dynamodb', region_name=REGION)
-    except Exception as e:
-        print(f"Error creating DynamoDB client: {str(e)}")
-        return None
+    """
+    Create a DynamoDB client.
+    
+    The resource is built once per process and reused on subsequent calls so
+    that all tests share the same connection pool.
+    """
+    global _dynamodb_resource
+    if _dynamodb_resource is None:
+        try:
+            _dynamodb_resource = boto3.resource(
+                'dynamodb',
+                region_name=REGION,
+                endpoint_url=DYNAMODB_ENDPOINT_URL,
+                config=DYNAMODB_CONFIG
+            )
+        except Exception as e:
+            print(f"Error creating DynamoDB client: {str(e)}")
+            return None
+    return _dynamodb_resource
 
 def create_test_customer(dynamodb, customer_id):
     """
@@ -112,24 +153,145 @@ def delete_test_customer(dynamodb, customer_id):
         print(f"❌ Error deleting test customer: {str(e)}")
         return False
 
+def create_http_session(cache_path=None):
+    """
+    Create an HTTP session with a pooled keep-alive connection adapter.
+    
+    Idempotent requests are retried on transient gateway errors. POST
+    requests are never retried, so chat commands are not applied twice.
+    
+    Args:
+        cache_path: Optional SQLite file in which successful GET responses
+            for static endpoints are cached for 12 hours (requires
+            requests-cache). Customer-scoped URLs are never cached, since
+            tests change them and read them back within the session.
+    
+    Returns:
+        The configured requests session
+    """
+    if cache_path:
+        import requests_cache
+        session = requests_cache.CachedSession(
+            cache_path,
+            expire_after=requests_cache.DO_NOT_CACHE,
+            urls_expire_after={
+                f"{REST_API_URL.split('://', 1)[1]}/capabilities": timedelta(hours=12)
+            },
+            allowable_methods=["GET"]
+        )
+    else:
+        session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=20,
+        max_retries=Retry(
+            total=2,
+            backoff_factor=0.2,
+            status_forcelist=[502, 503, 504],
+            raise_on_status=False
+        )
+    )
+    session.mount("https://", adapter)
+    return session
+
+def pytest_addoption(parser):
+    """Register the command line options for the end-to-end tests."""
+    parser.addoption(
+        "--use-requests-cache",
+        action="store_true",
+        default=False,
+        help="Cache static GET responses on disk between local runs (requires requests-cache)"
+    )
+
 @pytest.fixture(scope="session")
-def test_data():
+def http(pytestconfig):
     """
-    Fixture to set up and tear down test data for API tests.
+    Fixture providing a shared HTTP session for the test session.
     
-    This fixture creates a test customer with devices before running the tests,
-    and cleans up the data after the tests are complete.
+    Reusing one session keeps the TLS connection to API Gateway alive
+    across requests instead of opening a new one per call. A CORS preflight
+    request warms the pool, so the DNS lookup and TLS handshake are paid
+    before the first test rather than inside it.
+    
+    With --use-requests-cache, successful GET responses for static
+    endpoints are served from a cache in pytest's cache directory on reruns;
+    customer-scoped reads and other methods always hit the API.
     
     Returns:
-        A dictionary containing the test customer ID and device ID
+        The shared requests session
     """
-    # Generate a unique customer ID for this test run
-    customer_id = f"test-customer-e2e-{uuid.uuid4().hex[:8]}"
+    cache_path = None
+    if pytestconfig.getoption("use_requests_cache"):
+        cache_path = str(pytestconfig.cache.mkdir("requests-cache") / "requests-cache.sqlite")
+    session = create_http_session(cache_path)
+    try:
+        session.options(f"{REST_API_URL}/chat", timeout=5)
+    except requests.RequestException:
+        # A failed warm-up is not a test failure; the first test connects instead
+        pass
+    yield session
+    session.close()
+
+@pytest.fixture(scope="session")
+def chat_api(http):
+    """
+    Fixture skipping dependent tests when the chat endpoint is down.
     
-    # Create DynamoDB client
+    The endpoint is probed once per session with a message for an unknown
+    customer, which the API rejects without invoking the model. Only a
+    failed connection or a 502 counts as down; a slow response (such as a
+    Lambda cold start) is left for the tests to time out on, so an outage
+    is never confused with latency. Because the skip is cached with the
+    fixture, later tests skip without a request and before any test data
+    is provisioned.
+    
+    Args:
+        http: Shared HTTP session
+    """
+    try:
+        response = http.post(
+            f"{REST_API_URL}/chat",
+            json={"customerId": "__probe__", "message": "ping"},
+            timeout=CHAT_TIMEOUT
+        )
+    except requests.ConnectionError as e:
+        pytest.skip(f"Chat endpoint unreachable: {e}")
+    if response.status_code == 502:
+        pytest.skip("Chat endpoint returned 502 Bad Gateway")
+
+@pytest.fixture(scope="session")
+def dynamodb_client():
+    """
+    Fixture providing the shared DynamoDB resource for the test session.
+    
+    Returns:
+        The DynamoDB resource
+    """
     dynamodb = create_dynamodb_client()
     if not dynamodb:
         pytest.fail("Failed to create DynamoDB client")
+    return dynamodb
+
+@pytest.fixture(scope="session")
+def test_data(dynamodb_client):
+    """
+    Fixture to set up and tear down test data for API tests.
+    
+    This fixture creates a test customer with devices before running the tests,
+    and cleans up the data after the tests are complete. It is session-scoped,
+    so the customer is provisioned once and shared by every test; when the
+    suite runs in parallel each worker provisions its own customer.
+    
+    Returns:
+        A dictionary containing the test customer ID and device ID
+    """
+    # Generate a unique customer ID for this test run, tagged with the
+    # pytest-xdist worker (if any) so parallel workers never share a customer
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "main")
+    customer_id = f"test-customer-e2e-{worker}-{uuid.uuid4().hex[:8]}"
+    
+    # Reuse the shared DynamoDB client
+    dynamodb = dynamodb_client
     
     # Create test customer
     customer_data = create_test_customer(dynamodb, customer_id)
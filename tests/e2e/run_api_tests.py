@@ -11,6 +11,8 @@ import sys
 import unittest
 import json
 import uuid
+from contextlib import ExitStack
+from functools import partial
 from pathlib import Path
 from datetime import datetime
 
@@ -20,6 +22,8 @@ sys.path.insert(0, str(project_root))
 
 # Import boto3 for DynamoDB access
 import boto3
+# pytest's fail and skip outcomes are raised by the shared test helpers
+import pytest
 
 # Import the capabilities API tests
 from tests.e2e.test_capabilities_api import (
@@ -29,19 +33,23 @@ from tests.e2e.test_capabilities_api import (
 # Import the devices API tests
 from tests.e2e.test_devices_api import (
     test_get_devices,
-    test_get_devices_invalid_customer,
+    test_device_not_found,
     test_update_device,
-    test_update_device_invalid_customer,
-    test_update_device_invalid_device
+    DEVICES_URL,
+    DEVICE_URL
 )
 
 # Import the chat API tests
 from tests.e2e.test_chat_api import (
     test_chat_history,
-    test_chat_history_invalid_customer,
+    test_invalid_customer,
     test_send_message,
-    test_send_message_invalid_customer,
-    test_send_message_missing_parameters
+    test_send_message_missing_parameters,
+    test_send_message_batch,
+    test_send_message_batch_missing_parameters,
+    CHAT_URL,
+    CHAT_HISTORY_URL,
+    INVALID_CUSTOMER_BODY
 )
 
 # Import the customer API tests
@@ -56,15 +64,30 @@ from tests.e2e.test_chat_actions import (
     test_device_status_action,
     test_device_power_action,
     test_volume_control_action,
+    test_song_control_requires_enterprise,
     test_song_changes_action,
+    test_song_specific_play,
+    test_song_next,
+    test_song_previous,
+    test_song_next_batch,
     test_service_level_permissions,
-    test_basic_service_level_device_power,
-    test_basic_user_device_flow
+    TestBasicServiceLevel,
+    BASIC_RESTRICTED_COMMANDS,
+    seeded_customer,
+    basic_level_customer,
+    CUSTOMERS_TABLE,
+    SONG_PLAYLIST,
+    STATUS_EXECUTOR,
+    SPECIFIC_SONG_CASES,
+    NEXT_SONG_COMMANDS,
+    NEXT_SONG_EDGE_CASES,
+    PREVIOUS_SONG_COMMANDS
 )
 
 # Import test data setup functions from conftest.py
 from tests.e2e.conftest import (
     create_dynamodb_client,
+    create_http_session,
     create_test_customer,
     delete_test_customer
 )
@@ -107,27 +130,46 @@ def cleanup_test_data(test_data):
     if not delete_result:
         print(f"⚠️ Warning: Failed to delete test customer {test_data['customer_id']}")
 
-def run_test(test_func, name, test_data=None):
-    """Run a test function and return the result."""
+def run_test(test_func, name, fixtures=None, setup_fixtures=None):
+    """
+    Run a test function and return the result.
+    
+    fixtures maps parameter names to shared values; setup_fixtures maps
+    parameter names to factories returning a context manager, entered
+    around this test only. Parameters already bound with functools.partial,
+    as for parametrized tests, are left as bound.
+    """
     print(f"\n{'='*80}\nRunning test: {name}\n{'='*80}")
     try:
-        # Check if the function expects test_data
+        # Resolve the fixtures the function expects by parameter name
         import inspect
         sig = inspect.signature(test_func)
+        fixtures = fixtures or {}
+        setup_fixtures = setup_fixtures or {}
         
-        if 'test_data' in sig.parameters:
-            if test_data is None:
-                raise Exception("Test requires test_data but none was provided")
-            test_func(test_data)
-        else:
-            test_func()
+        with ExitStack() as stack:
+            kwargs = {}
+            for param, spec in sig.parameters.items():
+                if spec.default is not inspect.Parameter.empty:
+                    continue
+                if param in fixtures:
+                    kwargs[param] = fixtures[param]
+                elif param in setup_fixtures:
+                    kwargs[param] = stack.enter_context(setup_fixtures[param]())
+                else:
+                    raise Exception(f"Test requires {param} but none was provided")
+            test_func(**kwargs)
             
         print(f"\n✅ PASS: {name}")
         return True
-    except AssertionError as e:
+    except (AssertionError, pytest.fail.Exception) as e:
         print(f"\n❌ FAIL: {name}")
         print(f"Error: {str(e)}")
         return False
+    except pytest.skip.Exception as e:
+        print(f"\n⚠️ SKIP: {name}")
+        print(f"Reason: {str(e)}")
+        return True
     except Exception as e:
         print(f"\n❌ ERROR: {name}")
         print(f"Exception: {type(e).__name__}: {str(e)}")
@@ -149,26 +191,45 @@ def main():
         tests = [
             # Chat API tests
             (test_chat_history, "GET /chat/history/{customerId}"),
-            (test_chat_history_invalid_customer, "GET /chat/history/invalid-customer-id"),
+            (partial(test_invalid_customer, method="GET", url=CHAT_HISTORY_URL.format("invalid-customer-id"), body=None),
+             "GET /chat/history/invalid-customer-id"),
             (test_send_message, "POST /chat"),
-            (test_send_message_invalid_customer, "POST /chat with invalid customer ID"),
+            (partial(test_invalid_customer, method="POST", url=CHAT_URL, body=INVALID_CUSTOMER_BODY),
+             "POST /chat with invalid customer ID"),
             (test_send_message_missing_parameters, "POST /chat with missing parameters"),
+            (test_send_message_batch, "POST /chat/batch"),
+            (test_send_message_batch_missing_parameters, "POST /chat/batch with missing parameters"),
             
             # Chat Action tests
             (test_device_status_action, "Chat API - Device Status Action"),
             (test_device_power_action, "Chat API - Device Power Action"),
             (test_volume_control_action, "Chat API - Volume Control Action"),
+            (test_song_control_requires_enterprise, "Chat API - Song Control Requires Enterprise"),
             (test_song_changes_action, "Chat API - Song Changes Action"),
+            *[(partial(test_song_specific_play, command=command, expected_song=expected_song),
+               f"Chat API - Specific Song: {command}")
+              for command, expected_song in SPECIFIC_SONG_CASES],
+            *[(partial(test_song_next, command=command), f"Chat API - Next Song: {command}")
+              for command in NEXT_SONG_COMMANDS + NEXT_SONG_EDGE_CASES],
+            *[(partial(test_song_previous, command=command), f"Chat API - Previous Song: {command}")
+              for command in PREVIOUS_SONG_COMMANDS],
+            (test_song_next_batch, "Chat API - Next Song Batch"),
             (test_service_level_permissions, "Chat API - Service Level Permissions"),
-            (test_basic_service_level_device_power, "Chat API - Basic Service Level Device Power"),
-            (test_basic_user_device_flow, "Chat API - Basic User Device Flow"),
+            (TestBasicServiceLevel().test_device_power, "Chat API - Basic Service Level Device Power"),
+            (TestBasicServiceLevel().test_device_flow, "Chat API - Basic User Device Flow"),
+            *[(partial(TestBasicServiceLevel().test_restricted_command, command=command),
+               f"Chat API - Basic Service Level Restricted: {command}")
+              for command in BASIC_RESTRICTED_COMMANDS],
             
             # Devices API tests
             (test_get_devices, "GET /customers/{customerId}/devices"),
-            (test_get_devices_invalid_customer, "GET /customers/invalid-customer-id/devices"),
+            (partial(test_device_not_found, method="GET", url=DEVICES_URL, ids={"customer_id": "invalid-customer-id"}),
+             "GET /customers/invalid-customer-id/devices"),
             (test_update_device, "PATCH /customers/{customerId}/devices/{deviceId}"),
-            (test_update_device_invalid_customer, "PATCH /customers/invalid-customer-id/devices/{deviceId}"),
-            (test_update_device_invalid_device, "PATCH /customers/{customerId}/devices/invalid-device-id"),
+            (partial(test_device_not_found, method="PATCH", url=DEVICE_URL, ids={"customer_id": "invalid-customer-id"}),
+             "PATCH /customers/invalid-customer-id/devices/{deviceId}"),
+            (partial(test_device_not_found, method="PATCH", url=DEVICE_URL, ids={"device_id": "invalid-device-id"}),
+             "PATCH /customers/{customerId}/devices/invalid-device-id"),
             
             # Customer API tests
             (test_get_customers, "GET /customers"),
@@ -179,10 +240,32 @@ def main():
             (test_get_capabilities, "GET /capabilities")
         ]
         
+        # Fixtures available to the tests, keyed by parameter name
+        fixtures = {
+            'test_data': test_data,
+            'dynamodb_client': test_data['dynamodb'],
+            'http': create_http_session()
+        }
+        
+        # Per-test state setup, mirroring the fixtures in test_chat_actions.py
+        customers_table = test_data['dynamodb'].Table(CUSTOMERS_TABLE)
+        setup_fixtures = {
+            'premium_customer': lambda: seeded_customer(
+                customers_table, test_data['customer_id'], 'premium'
+            ),
+            'enterprise_speaker': lambda: seeded_customer(
+                customers_table, test_data['customer_id'], 'enterprise',
+                power='on', current_song=SONG_PLAYLIST[0]
+            ),
+            'basic_customer': lambda: basic_level_customer(
+                customers_table, test_data['customer_id']
+            )
+        }
+        
         # Run the tests
         results = {}
         for test_func, name in tests:
-            results[name] = run_test(test_func, name, test_data)
+            results[name] = run_test(test_func, name, fixtures, setup_fixtures)
         
         # Print summary
         print("\n\n📊 API Endpoint Verification Summary:")
@@ -204,7 +287,8 @@ def main():
         return 0 if all(results.values()) else 1
     
     finally:
-        # Clean up test data
+        # Stop the background status requests and clean up test data
+        STATUS_EXECUTOR.shutdown(wait=True)
         cleanup_test_data(test_data)
 
 if __name__ == "__main__":
@@ -9,101 +9,360 @@ This module tests the different actions that can be performed through the chat A
 """
 
 # Standard library imports
-import json
-import os
-import sys
+import re
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from functools import lru_cache
 from decimal import Decimal
-from datetime import datetime
-from typing import Any, Dict, Optional, Union, cast, TypedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional, cast
 
 # Third-party imports
-import boto3
+import orjson
 import pytest
 import requests
 from mypy_boto3_dynamodb.service_resource import Table
 from mypy_boto3_dynamodb import ServiceResource as DynamoDBServiceResource
 import logging
 
-# Add the project root to the Python path so that imports work correctly
-current_dir = os.path.dirname(os.path.abspath(__file__))
-parent_dir = os.path.dirname(os.path.dirname(current_dir))
-if parent_dir not in sys.path:
-    sys.path.insert(0, parent_dir)
+from tests.e2e._helpers import CHAT_TIMEOUT, JSON_HEADERS, says_power_on
+
+# Skip the whole module, before any test data is created, when the chat endpoint is down
+pytestmark = pytest.mark.usefixtures("chat_api")
 
 # Environment variables - using the same configuration as conftest.py
 REST_API_URL = "https://k4w64ym45e.execute-api.us-west-2.amazonaws.com/dev/api"
 REGION = "us-west-2"  # Match the region in conftest.py
 CUSTOMERS_TABLE = "dev-customers"  # Match the table name in conftest.py
 SERVICE_LEVELS_TABLE = "dev-service-levels"  # Add service levels table
+CHAT_URL = f"{REST_API_URL}/chat"
+CHAT_BATCH_URL = f"{REST_API_URL}/chat/batch"
+# Messages per batch request; each message is a separate model call inside one
+# Lambda invocation, so larger batches risk API Gateway's 29 s integration timeout
+CHAT_BATCH_SIZE = 2
+
+# Runs status requests concurrently with the DynamoDB verification reads;
+# shut down by the status_executor fixture or by run_api_tests.py
+STATUS_EXECUTOR = ThreadPoolExecutor(max_workers=4)
+
+# Word-bounded power mentions, so e.g. "gone" or "offer" never match
+POWER_OFF_RE = re.compile(r"\boff\b")
+POWER_STATE_RE = re.compile(r"\b(?:on|off)\b")
+# Device mentions are not word-bounded, so plurals such as "speakers" also match
+DEVICE_RE = re.compile(r"speaker|device")
 
-# Type definitions
-class DeviceState(TypedDict):
-    id: str
-    power: str
-    volume: int
-    current_song: str
-    type: str
-    location: str
-    playlist: list[str]
+# Chat messages sent by more than one test; their encoded bodies are cached by chat_body
+MESSAGES = {
+    "status": "What's the status of my speaker?",
+    "volume_status": "What's the volume of my speaker?",
+    "playing": "What's playing now?",
+    "power_on": "Turn on my speaker",
+    "power_off": "Turn off my speaker",
+    "set_volume_80": "Set the volume to 80",
+    "next_song": "Play next song"
+}
 
-class DynamoDBItem(TypedDict):
-    id: str
-    device: Dict[str, Any]
+# Phrases confirming a volume change or an enterprise-only restriction
+VOL_UP_RE = re.compile(r"volume|increased|turned up")
+VOL_DOWN_RE = re.compile(r"volume|decreased|turned down")
+VOL_SET_RE = re.compile(r"volume|set|changed|adjusted")
+UPGRADE_RE = re.compile(r"only available with|enterprise service plan|please upgrade")
 
-class DynamoDBResponse(TypedDict):
-    Item: DynamoDBItem
+# Phrases signalling a service level restriction; "basic" only counts when a restriction is expected
+RESTRICT_RE = re.compile(r"premium|upgrade|not available|basic|not allowed")
+POWER_RESTRICT_RE = re.compile(r"premium|upgrade|not available|not allowed")
 
-class DynamoDBEncoder(json.JSONEncoder):
-    def default(self, obj: Any) -> Any:
-        if isinstance(obj, Decimal):
-            return str(obj)
-        return super().default(obj)
+# Requests a basic service level customer should be refused
+BASIC_RESTRICTED_COMMANDS = [
+    MESSAGES["set_volume_80"],
+    "Turn up the volume",
+    MESSAGES["next_song"]
+]
+
+# Playlist seeded for the test customer, and the song commands exercised against it
+SONG_PLAYLIST = ["Test Song 1", "Test Song 2", "Test Song 3", "Test Song 4"]
+# Device attributes as created by the test_data fixture, restored after seeding
+INITIAL_DEVICE_STATE = {"power": "off", "current_song": SONG_PLAYLIST[0]}
+SPECIFIC_SONG_CASES = [
+    ("Play Test Song 2", "Test Song 2"),
+    ("Put on Test Song 2", "Test Song 2"),
+    ("Switch to Test Song 3", "Test Song 3"),
+    ("Change song to Test Song 2", "Test Song 2")
+]
+NEXT_SONG_COMMANDS = [
+    "Play next song",
+    "Skip this song",
+    "Skip to next",
+    "Play something different",
+    "Change song",
+    "Next song"
+]
+NEXT_SONG_EDGE_CASES = [
+    "Can you play the next song please?",
+    "PLAY NEXT SONG",
+    "play something else",
+    "i don't like this song"
+]
+PREVIOUS_SONG_COMMANDS = [
+    "Play previous song",
+    "Go back to previous track",
+    "Play the previous song",
+    "Previous song"
+]
 
 # Configure logging for tests
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def verify_device_power(customer_id: str, expected_power: str, operation: str, table: Table) -> None:
+# Power state checks for chat replies, keyed by the expected power state
+POWER_CHECKS: Dict[str, Callable[[str], bool]] = {
+    "on": says_power_on,
+    "off": lambda message: POWER_OFF_RE.search(message) is not None
+}
+
+@lru_cache(maxsize=128)
+def chat_body(customer_id: str, message: str) -> bytes:
+    """
+    Encode a chat request body, reusing the bytes for repeated messages.
+    
+    Args:
+        customer_id: The ID of the customer sending the message
+        message: The chat message to send
+        
+    Returns:
+        The JSON-encoded request body
+    """
+    return orjson.dumps({"customerId": customer_id, "message": message})
+
+def send_chat(http: requests.Session, customer_id: str, message: str) -> str:
+    """
+    Send a chat message and return the lowercased response text.
+    
+    Skips the test on the known 502 Bad Gateway issue and asserts a 200
+    response containing a 'message' field.
+    
+    Args:
+        http: The shared HTTP session
+        customer_id: The ID of the customer sending the message
+        message: The chat message to send
+        
+    Returns:
+        The response message, lowercased
+    """
+    response = http.post(
+        CHAT_URL,
+        data=chat_body(customer_id, message),
+        headers=JSON_HEADERS,
+        timeout=CHAT_TIMEOUT
+    )
+    
+    # Check for 502 Bad Gateway error (known issue)
+    if response.status_code == 502:
+        pytest.skip("Chat endpoint returned 502 Bad Gateway error (known issue)")
+    
+    assert response.status_code == 200, f"Expected status code 200, got {response.status_code}: {response.text}"
+    
+    return chat_message(response)
+
+def chat_message(response: requests.Response, error: str = "Response should contain 'message' field") -> str:
+    """
+    Parse a chat response body once and return its message, lowercased.
+    
+    Args:
+        response: A successful chat API response
+        error: Assertion message used when the body has no 'message' field
+        
+    Returns:
+        The response message, lowercased
+    """
+    try:
+        return orjson.loads(response.content)["message"].lower()
+    except KeyError:
+        pytest.fail(error)
+
+def send_chat_batch(http: requests.Session, customer_id: str, messages: List[str]) -> List[Dict[str, Any]]:
+    """
+    Send several chat messages in one batch request and return the per-message responses.
+    
+    Args:
+        http: The shared HTTP session
+        customer_id: The ID of the customer sending the messages
+        messages: The chat messages to send, processed in order
+        
+    Returns:
+        One parsed chat response per message, in request order
+    """
+    response = http.post(
+        CHAT_BATCH_URL,
+        data=orjson.dumps({"customerId": customer_id, "messages": messages}),
+        headers=JSON_HEADERS,
+        timeout=CHAT_TIMEOUT
+    )
+    
+    # Check for 502 Bad Gateway error (known issue)
+    if response.status_code == 502:
+        pytest.skip("Chat batch endpoint returned 502 Bad Gateway error (known issue)")
+    
+    assert response.status_code == 200, f"Expected status code 200, got {response.status_code}: {response.text}"
+    
+    data = orjson.loads(response.content)
+    assert "results" in data, "Response should contain 'results' field"
+    assert len(data["results"]) == len(messages), "Response should contain one result per message"
+    return data["results"]
+
+def wait_for_item(
+    table: Table,
+    customer_id: str,
+    predicate: Callable[[Dict[str, Any]], bool],
+    timeout: float = 5.0,
+    initial_delay: float = 0.05,
+    backoff: float = 1.5
+) -> Dict[str, Any]:
+    """
+    Poll a customer's device with strongly consistent reads until a condition holds.
+    
+    The first read usually already reflects the change, so this returns
+    immediately in the common case; otherwise the delay between reads
+    starts small and grows until the timeout is reached. Only the device
+    attribute is read, which is all the callers check.
+    
+    Args:
+        table: The DynamoDB table to query
+        customer_id: The ID of the customer to read
+        predicate: Condition evaluated against the item, holding only 'device'
+        timeout: Maximum time to wait in seconds
+        initial_delay: Delay before the second read in seconds
+        backoff: Multiplier applied to the delay after each read
+        
+    Returns:
+        The last get_item response, whether or not the condition was met
+    """
+    get_item = table.get_item
+    deadline = time.monotonic() + timeout
+    delay = initial_delay
+    while True:
+        response = get_item(
+            Key={'id': customer_id},
+            ConsistentRead=True,
+            ProjectionExpression="#device",
+            ExpressionAttributeNames={"#device": "device"}
+        )
+        if predicate(response.get('Item', {})) or time.monotonic() >= deadline:
+            return cast(Dict[str, Any], response)
+        time.sleep(delay)
+        delay *= backoff
+
+def set_service_level(table: Table, customer_id: str, level: str, from_level: Optional[str] = None) -> None:
+    """
+    Set a customer's service level in a single conditional write.
+    
+    The condition makes the write fail if the customer does not exist (or,
+    when from_level is given, is not currently at that level), so the level
+    needs no read-back to confirm the change.
+    
+    Args:
+        table: The customers table
+        customer_id: The ID of the customer to update
+        level: The service level to set
+        from_level: The service level the customer must currently have, if any
+    """
+    condition = "attribute_exists(#id)"
+    values = {':val': level}
+    if from_level is not None:
+        condition += " AND #lvl = :from"
+        values[':from'] = from_level
+    try:
+        table.update_item(
+            Key={'id': customer_id},
+            UpdateExpression="SET #lvl = :val",
+            ConditionExpression=condition,
+            ExpressionAttributeNames={'#lvl': 'level', '#id': 'id'},
+            ExpressionAttributeValues=values
+        )
+    except table.meta.client.exceptions.ConditionalCheckFailedException:
+        expected = f"at the {from_level} level" if from_level else "found"
+        pytest.fail(f"Customer {customer_id} was not {expected} when setting service level to {level}")
+
+def set_device_power(table: Table, customer_id: str, power: str) -> None:
+    """
+    Set a customer's device power directly, for tests that only need it as a precondition.
+    
+    Args:
+        table: The customers table
+        customer_id: The ID of the customer whose device to update
+        power: The power state to set ('on' or 'off')
+    """
+    table.update_item(
+        Key={'id': customer_id},
+        UpdateExpression="SET #device.#power = :power",
+        ExpressionAttributeNames={'#device': 'device', '#power': 'power'},
+        ExpressionAttributeValues={':power': power}
+    )
+
+@contextmanager
+def status_request(http: requests.Session, customer_id: str, message: str) -> Iterator[Future]:
+    """
+    Send a chat status request in the background for the duration of a block.
+    
+    If the block raises, the request is cancelled, or waited for when it has
+    already started, so it never outlives the check that sent it.
+    
+    Args:
+        http: The shared HTTP session
+        customer_id: The ID of the customer sending the message
+        message: The chat message to send
+        
+    Yields:
+        The future for the status response
+    """
+    status_future = STATUS_EXECUTOR.submit(
+        http.post,
+        CHAT_URL,
+        data=chat_body(customer_id, message),
+        headers=JSON_HEADERS,
+        timeout=CHAT_TIMEOUT
+    )
+    try:
+        yield status_future
+    finally:
+        if not status_future.cancel():
+            status_future.exception()
+
+def verify_device_power(http: requests.Session, customer_id: str, expected_power: str, operation: str, table: Table) -> None:
     """
     Helper function to verify device power status in DynamoDB and via status request.
     
     Args:
+        http: The shared HTTP session
         customer_id: The ID of the customer whose device to verify
         expected_power: The expected power status ('on' or 'off')
         operation: Description of the operation being verified (for error messages)
         table: The DynamoDB table to query
     """
-    logger.info(f"Verifying device power after {operation} - expecting power: {expected_power}")
-    
-    # Wait a moment for DynamoDB to propagate the change
-    time.sleep(2)
-    
-    # 1. Verify DynamoDB power status
-    response = table.get_item(Key={'id': customer_id})
-    logger.info(f"DynamoDB response for power verification: {response}")
-    
-    db_response = cast(DynamoDBResponse, response)
-    assert 'Item' in db_response, f"Customer {customer_id} not found in DynamoDB after {operation}"
-    customer = db_response['Item']
-    device = customer.get('device')
-    assert device is not None, f"Device not found in customer data after {operation}"
-    device_state = cast(DeviceState, device)
-    
-    current_power = device_state.get('power')
-    logger.info(f"Current device power in DynamoDB: {current_power}")
-    assert current_power == expected_power, \
-        f"Expected device power in DynamoDB to be {expected_power} after {operation}, got {current_power}"
-    
-    # 2. Verify via status request
-    logger.info("Sending status request to verify power via API")
-    status_response = requests.post(
-        f"{REST_API_URL}/chat",
-        json={
-            "customerId": customer_id,
-            "message": "What's the status of my speaker?"
-        }
-    )
+    logger.debug("Verifying device power after %s - expecting power: %s", operation, expected_power)
+    
+    # Send the status request in the background while DynamoDB is checked;
+    # both only read state that the action has already written
+    logger.debug("Sending status request to verify power via API")
+    with status_request(http, customer_id, MESSAGES["status"]) as status_future:
+        # 1. Verify DynamoDB power status
+        response = wait_for_item(
+            table, customer_id, lambda item: item.get('device', {}).get('power') == expected_power
+        )
+        logger.debug("DynamoDB response for power verification: %r", response)
+        
+        try:
+            device = response['Item']['device']
+        except KeyError:
+            pytest.fail(f"Customer {customer_id} or its device not found in DynamoDB after {operation}")
+        
+        current_power = device.get('power')
+        logger.debug("Current device power in DynamoDB: %s", current_power)
+        assert current_power == expected_power, \
+            f"Expected device power in DynamoDB to be {expected_power} after {operation}, got {current_power}"
+        
+        # 2. Verify via status request
+        status_response = status_future.result()
     
     if status_response.status_code == 502:
         logger.warning("Received 502 Bad Gateway error during status check")
@@ -112,66 +371,59 @@ def verify_device_power(customer_id: str, expected_power: str, operation: str, t
     assert status_response.status_code == 200, \
         f"Expected status code 200 for status check after {operation}, got {status_response.status_code}"
     
-    status_data = status_response.json()
-    logger.info(f"Status API response: {status_data}")
+    logger.debug("Status API response: %s", status_response.text)
     
-    assert "message" in status_data, f"Status response after {operation} should contain 'message' field"
-    status_message = status_data["message"].lower()
+    status_message = chat_message(status_response, f"Status response after {operation} should contain 'message' field")
     
     # Verify the status message reflects the correct power status
-    assert expected_power in status_message, \
+    assert POWER_CHECKS[expected_power](status_message), \
         f"Status message after {operation} should indicate device is {expected_power}: {status_message}"
     
     # If checking for 'off' status, ensure 'on' isn't present or is negated
     if expected_power == 'off':
-        assert 'on' not in status_message or ('not' in status_message and 'on' in status_message), \
+        assert not says_power_on(status_message), \
             f"Status message for 'off' power should not indicate device is on: {status_message}"
     
-    logger.info(f"Successfully verified device power after {operation}")
+    logger.info("Verified device power after %s", operation)
 
-def verify_device_volume(customer_id: str, operation: str, table: Table) -> None:
+def verify_device_volume(http: requests.Session, customer_id: str, operation: str, table: Table) -> None:
     """
     Helper function to verify device volume in DynamoDB and via status request.
     
     Args:
+        http: The shared HTTP session
         customer_id: The ID of the customer whose device to verify
         operation: Description of the operation being verified (for error messages)
         table: The DynamoDB table to query
     """
-    logger.info(f"Verifying device volume after {operation}")
-    
-    # Wait a moment for DynamoDB to propagate the change
-    time.sleep(2)
-    
-    # 1. Verify DynamoDB state
-    response = table.get_item(Key={'id': customer_id})
-    logger.info(f"DynamoDB response for volume verification: {response}")
-    
-    db_response = cast(DynamoDBResponse, response)
-    assert 'Item' in db_response, f"Customer {customer_id} not found in DynamoDB after {operation}"
-    customer = db_response['Item']
-    device = customer.get('device')
-    assert device is not None, f"Device not found in customer data after {operation}"
-    device_state = cast(DeviceState, device)
-    
-    # Verify the device is powered on
-    assert device_state.get('power') == 'on', f"Device must be powered on to verify volume after {operation}"
-    
-    # Verify volume is within valid range
-    volume = device_state.get('volume')
-    assert isinstance(volume, (int, Decimal)), f"Volume should be a number, got {type(volume)}"
-    volume_int = int(volume)
-    assert 0 <= volume_int <= 100, f"Volume should be between 0 and 100, got {volume_int}"
-    
-    # 2. Verify via status request
-    logger.info("Sending status request to verify volume via API")
-    status_response = requests.post(
-        f"{REST_API_URL}/chat",
-        json={
-            "customerId": customer_id,
-            "message": "What's the volume of my speaker?"
-        }
-    )
+    logger.debug("Verifying device volume after %s", operation)
+    
+    # Send the status request in the background while DynamoDB is checked;
+    # both only read state that the action has already written
+    logger.debug("Sending status request to verify volume via API")
+    with status_request(http, customer_id, MESSAGES["volume_status"]) as status_future:
+        # 1. Verify DynamoDB state
+        response = wait_for_item(
+            table, customer_id, lambda item: item.get('device', {}).get('power') == 'on'
+        )
+        logger.debug("DynamoDB response for volume verification: %r", response)
+        
+        try:
+            device = response['Item']['device']
+        except KeyError:
+            pytest.fail(f"Customer {customer_id} or its device not found in DynamoDB after {operation}")
+        
+        # Verify the device is powered on
+        assert device.get('power') == 'on', f"Device must be powered on to verify volume after {operation}"
+        
+        # Verify volume is within valid range
+        volume = device.get('volume')
+        assert isinstance(volume, (int, Decimal)), f"Volume should be a number, got {type(volume)}"
+        volume_int = int(volume)
+        assert 0 <= volume_int <= 100, f"Volume should be between 0 and 100, got {volume_int}"
+        
+        # 2. Verify via status request
+        status_response = status_future.result()
     
     if status_response.status_code == 502:
         logger.warning("Received 502 Bad Gateway error during status check")
@@ -180,60 +432,35 @@ def verify_device_volume(customer_id: str, operation: str, table: Table) -> None
     assert status_response.status_code == 200, \
         f"Expected status code 200 for status check after {operation}, got {status_response.status_code}"
     
-    status_data = status_response.json()
-    logger.info(f"Status API response: {status_data}")
+    logger.debug("Status API response: %s", status_response.text)
     
-    assert "message" in status_data, f"Status response after {operation} should contain 'message' field"
-    status_message = status_data["message"].lower()
+    status_message = chat_message(status_response, f"Status response after {operation} should contain 'message' field")
     
     # For volume changes, verify that the response mentions volume
     assert "volume" in status_message, \
         f"Status message after {operation} should mention volume: {status_message}"
     
-    logger.info(f"Successfully verified device volume after {operation}")
+    logger.info("Verified device volume after %s", operation)
 
-def test_device_status_action(test_data: Dict[str, str]) -> None:
+def test_device_status_action(test_data: Dict[str, str], http: requests.Session) -> None:
     """
     Test the device_status action through the chat API.
     
     Args:
         test_data: Dictionary containing test customer and device IDs
+        http: Shared HTTP session
     """
     # Get customer ID from test data fixture
     customer_id = test_data['customer_id']
     
-    # Prepare request body
-    message = "What's the status of my speaker?"
-    body = {
-        "customerId": customer_id,
-        "message": message
-    }
-    
     # Send the request
-    response = requests.post(
-        f"{REST_API_URL}/chat",
-        json=body
-    )
-    
-    # Check for 502 Bad Gateway error (known issue)
-    if response.status_code == 502:
-        pytest.skip("Chat endpoint returned 502 Bad Gateway error (known issue)")
-    
-    # Verify response status code
-    assert response.status_code == 200, f"Expected status code 200, got {response.status_code}: {response.text}"
-    
-    # Parse response body
-    data = response.json()
-    
-    # Verify response contains device status information
-    assert "message" in data, "Response should contain 'message' field"
-    message_text = data["message"].lower()
+    message_text = send_chat(http, customer_id, MESSAGES["status"])
     
     # Check that the response mentions the device type and power state
-    assert any(term in message_text for term in ["speaker", "device"]), "Response should mention the device type"
-    assert any(state in message_text for state in ["on", "off"]), "Response should mention the power state"
+    assert DEVICE_RE.search(message_text), "Response should mention the device type"
+    assert POWER_STATE_RE.search(message_text), "Response should mention the power state"
 
-def test_device_power_action(test_data: Dict[str, str]) -> None:
+def test_device_power_action(test_data: Dict[str, str], dynamodb_client: DynamoDBServiceResource, http: requests.Session) -> None:
     """
     Test the device_power action through the chat API.
     
@@ -246,89 +473,44 @@ def test_device_power_action(test_data: Dict[str, str]) -> None:
     
     Args:
         test_data: Dictionary containing test customer and device IDs
+        dynamodb_client: Shared DynamoDB resource
+        http: Shared HTTP session
     """
     # Get customer ID from test data fixture
     customer_id = test_data['customer_id']
-    logger.info(f"Starting device power test for customer {customer_id}")
+    logger.info("Starting device power test for customer %s", customer_id)
     
-    # Create DynamoDB client
-    dynamodb: DynamoDBServiceResource = boto3.resource('dynamodb', region_name=REGION)
-    table: Table = dynamodb.Table(CUSTOMERS_TABLE)
+    # Reuse the shared DynamoDB client
+    table: Table = dynamodb_client.Table(CUSTOMERS_TABLE)
     
     # First, turn the device on
     logger.info("\n💡 Testing power on...")
-    on_message = "Turn on my speaker"
-    on_body = {
-        "customerId": customer_id,
-        "message": on_message
-    }
-    
     # Send the request to turn on
     logger.info("Sending request to turn on device")
-    on_response = requests.post(
-        f"{REST_API_URL}/chat",
-        json=on_body
-    )
-    
-    # Check for 502 Bad Gateway error (known issue)
-    if on_response.status_code == 502:
-        logger.warning("Received 502 Bad Gateway error during power on request")
-        pytest.skip("Chat endpoint returned 502 Bad Gateway error (known issue)")
-    
-    # Verify response status code
-    assert on_response.status_code == 200, \
-        f"Expected status code 200 for power on, got {on_response.status_code}: {on_response.text}"
-    
-    # Parse response body
-    on_data = on_response.json()
-    logger.info(f"Power on response: {on_data}")
+    on_message_text = send_chat(http, customer_id, MESSAGES["power_on"])
+    logger.debug("Power on response: %s", on_message_text)
     
     # Verify response indicates the device was turned on
-    assert "message" in on_data, "Response should contain 'message' field"
-    on_message_text = on_data["message"].lower()
-    assert "on" in on_message_text, "Response should confirm the device was turned on"
+    assert says_power_on(on_message_text), "Response should confirm the device was turned on"
     
     # Verify the device power in DynamoDB and via status request
-    verify_device_power(customer_id, 'on', 'power on', table)
+    verify_device_power(http, customer_id, 'on', 'power on', table)
     
     # Now, turn the device off
     logger.info("\n💡 Testing power off...")
-    off_message = "Turn off my speaker"
-    off_body = {
-        "customerId": customer_id,
-        "message": off_message
-    }
-    
     # Send the request to turn off
     logger.info("Sending request to turn off device")
-    off_response = requests.post(
-        f"{REST_API_URL}/chat",
-        json=off_body
-    )
-    
-    # Check for 502 Bad Gateway error (known issue)
-    if off_response.status_code == 502:
-        logger.warning("Received 502 Bad Gateway error during power off request")
-        pytest.skip("Chat endpoint returned 502 Bad Gateway error (known issue)")
-    
-    # Verify response status code
-    assert off_response.status_code == 200, \
-        f"Expected status code 200 for power off, got {off_response.status_code}: {off_response.text}"
-    
-    # Parse response body
-    off_data = off_response.json()
-    logger.info(f"Power off response: {off_data}")
+    off_message_text = send_chat(http, customer_id, MESSAGES["power_off"])
+    logger.debug("Power off response: %s", off_message_text)
     
     # Verify response indicates the device was turned off
-    assert "message" in off_data, "Response should contain 'message' field"
-    off_message_text = off_data["message"].lower()
-    assert "off" in off_message_text, "Response should confirm the device was turned off"
+    assert POWER_OFF_RE.search(off_message_text), "Response should confirm the device was turned off"
     
     # Verify the device power in DynamoDB and via status request
-    verify_device_power(customer_id, 'off', 'power off', table)
+    verify_device_power(http, customer_id, 'off', 'power off', table)
     logger.info("Device power test completed successfully")
 
-def test_volume_control_action(test_data: Dict[str, str]) -> None:
+def test_volume_control_action(test_data: Dict[str, str], dynamodb_client: DynamoDBServiceResource, http: requests.Session) -> None:
     """
     Test the volume_control action through the chat API.
     
@@ -342,783 +524,540 @@ def test_volume_control_action(test_data: Dict[str, str]) -> None:
     # Get customer ID from test data fixture
     customer_id = test_data['customer_id']
     
-    # Create DynamoDB client
-    dynamodb: DynamoDBServiceResource = boto3.resource('dynamodb', region_name=REGION)
-    table: Table = dynamodb.Table(CUSTOMERS_TABLE)
-    
-    # First, make sure the device is on
-    power_response = requests.post(
-        f"{REST_API_URL}/chat",
-        json={
-            "customerId": customer_id,
-            "message": "Turn on my speaker"
-        }
-    )
-    
-    if power_response.status_code == 502:
-        pytest.skip("Chat endpoint returned 502 Bad Gateway error (known issue)")
+    # Reuse the shared DynamoDB client
+    table: Table = dynamodb_client.Table(CUSTOMERS_TABLE)
     
-    assert power_response.status_code == 200
+    # First, make sure the device is on; power control has its own test, so
+    # seed the state directly instead of going through the chat API
+    set_device_power(table, customer_id, 'on')
     
     # Now, increase the volume
-    up_message = "Turn up the volume"
-    up_body = {
-        "customerId": customer_id,
-        "message": up_message
-    }
-    
-    # Send the request to increase volume
-    up_response = requests.post(
-        f"{REST_API_URL}/chat",
-        json=up_body
-    )
-    
-    # Check for 502 Bad Gateway error (known issue)
-    if up_response.status_code == 502:
-        pytest.skip("Chat endpoint returned 502 Bad Gateway error (known issue)")
-    
-    # Verify response status code
-    assert up_response.status_code == 200, f"Expected status code 200, got {up_response.status_code}: {up_response.text}"
-    
-    # Parse response body
-    up_data = up_response.json()
+    up_message_text = send_chat(http, customer_id, "Turn up the volume")
     
     # Verify response indicates the volume was increased
-    assert "message" in up_data, "Response should contain 'message' field"
-    up_message_text = up_data["message"].lower()
-    assert any(phrase in up_message_text for phrase in ["volume", "increased", "turned up"]), \
+    assert VOL_UP_RE.search(up_message_text), \
         "Response should confirm the volume was increased"
     
     # Verify the device state in DynamoDB and via status request
-    verify_device_volume(customer_id, 'volume increase', table)
+    verify_device_volume(http, customer_id, 'volume increase', table)
     
     # Now, decrease the volume
-    down_message = "Turn down the volume"
-    down_body = {
-        "customerId": customer_id,
-        "message": down_message
-    }
-    
-    # Send the request to decrease volume
-    down_response = requests.post(
-        f"{REST_API_URL}/chat",
-        json=down_body
-    )
-    
-    # Check for 502 Bad Gateway error (known issue)
-    if down_response.status_code == 502:
-        pytest.skip("Chat endpoint returned 502 Bad Gateway error (known issue)")
-    
-    # Verify response status code
-    assert down_response.status_code == 200, f"Expected status code 200, got {down_response.status_code}: {down_response.text}"
-    
-    # Parse response body
-    down_data = down_response.json()
+    down_message_text = send_chat(http, customer_id, "Turn down the volume")
     
     # Verify response indicates the volume was decreased
-    assert "message" in down_data, "Response should contain 'message' field"
-    down_message_text = down_data["message"].lower()
-    assert any(phrase in down_message_text for phrase in ["volume", "decreased", "turned down"]), \
+    assert VOL_DOWN_RE.search(down_message_text), \
         "Response should confirm the volume was decreased"
     
     # Verify the device state in DynamoDB and via status request
-    verify_device_volume(customer_id, 'volume decrease', table)
+    verify_device_volume(http, customer_id, 'volume decrease', table)
     
     # Test setting volume to a specific level
-    set_volume_message = "Set the volume to 60%"
-    set_volume_body = {
-        "customerId": customer_id,
-        "message": set_volume_message
-    }
-    
-    # Send the request to set specific volume
-    set_volume_response = requests.post(
-        f"{REST_API_URL}/chat",
-        json=set_volume_body
-    )
-    
-    # Check for 502 Bad Gateway error (known issue)
-    if set_volume_response.status_code == 502:
-        pytest.skip("Chat endpoint returned 502 Bad Gateway error (known issue)")
-    
-    # Verify response status code
-    assert set_volume_response.status_code == 200, \
-        f"Expected status code 200 for setting volume, got {set_volume_response.status_code}: {set_volume_response.text}"
-    
-    # Parse response body
-    set_volume_data = set_volume_response.json()
+    set_volume_message_text = send_chat(http, customer_id, "Set the volume to 60%")
     
     # Verify response indicates the volume was set to the specific level
-    assert "message" in set_volume_data, "Response should contain 'message' field"
-    set_volume_message_text = set_volume_data["message"].lower()
     assert "60" in set_volume_message_text, \
         "Response should confirm the volume was set to 60%"
-    assert any(phrase in set_volume_message_text for phrase in ["volume", "set", "changed", "adjusted"]), \
+    assert VOL_SET_RE.search(set_volume_message_text), \
         "Response should indicate the volume was changed"
     
     # Verify the device state in DynamoDB and via status request
-    verify_device_volume(customer_id, 'set volume', table)
+    verify_device_volume(http, customer_id, 'set volume', table)
 
-def test_song_changes_action(test_data: Dict[str, str]) -> None:
+def verify_song_state(
+    http: requests.Session,
+    table: Table,
+    customer_id: str,
+    device_id: str,
+    expected_song: str,
+    operation: str,
+    check_status: bool = True
+) -> None:
     """
-    Test the song_control action through the chat API.
+    Helper function to verify song state in DynamoDB and via status request.
     
-    This test verifies that:
-    1. Premium users cannot change songs (permission denied)
-    2. After upgrading to enterprise, users can:
-       - Play specific songs by name
-       - Play next/previous songs
-       - Handle errors for non-existent songs
-    3. DynamoDB state reflects song changes
-    4. Subsequent status requests confirm the song changes
+    Args:
+        http: The shared HTTP session
+        table: The DynamoDB table to query
+        customer_id: The ID of the customer whose device to verify
+        device_id: The expected ID of the customer's device
+        expected_song: The song expected to be playing
+        operation: Description of the operation being verified (for error messages)
+        check_status: Whether to also confirm the song via a status request
     """
-    # Get customer ID from test data fixture
-    customer_id = test_data['customer_id']
-    print(f"\n🎵 Starting song control test for customer: {customer_id}")
-    
-    # Create DynamoDB client
-    dynamodb = boto3.resource('dynamodb', region_name=REGION)
-    table = dynamodb.Table(CUSTOMERS_TABLE)
+    logger.debug("Verifying song state after %s", operation)
+    logger.debug("Expected song: %r", expected_song)
     
-    def verify_song_state(expected_song: str, operation: str) -> None:
-        """Helper function to verify song state in DynamoDB and via status request"""
-        print(f"\n🔍 Verifying song state after {operation}")
-        print(f"  Expected song: {expected_song}")
-        
-        # Wait a moment for DynamoDB to propagate the change
-        time.sleep(2)
-        
+    # Send the status request in the background while DynamoDB is checked
+    status = status_request(http, customer_id, MESSAGES["playing"]) if check_status else nullcontext()
+    with status as status_future:
         # 1. Verify DynamoDB state
-        response = table.get_item(Key={'id': customer_id})
-        response_typed = cast(DynamoDBResponse, response)
-        print(f"  DynamoDB response: {json.dumps(response_typed, indent=2, cls=DynamoDBEncoder)}")
-        assert 'Item' in response_typed, f"Customer {customer_id} not found in DynamoDB after {operation}"
-        customer = response_typed['Item']
-        device = cast(DeviceState, customer.get('device', {}))
-        print(f"  Device state: {json.dumps(device, indent=2, cls=DynamoDBEncoder)}")
-        assert device is not None, f"Device not found in customer data after {operation}"
-        assert device['id'] == test_data['device_id'], f"Device ID mismatch after {operation}"
-        
-        if operation == 'premium user song change attempt':
-            # For premium users, verify the song hasn't changed and access was denied
-            assert device.get('current_song') == expected_song, \
-                f"Song should not change for premium users. Expected {expected_song}, got {device.get('current_song')}"
-            return
+        response = wait_for_item(
+            table, customer_id, lambda item: item.get('device', {}).get('current_song') == expected_song
+        )
+        logger.debug("DynamoDB response: %r", response)
+        try:
+            device = response['Item']['device']
+        except KeyError:
+            pytest.fail(f"Customer {customer_id} or its device not found in DynamoDB after {operation}")
+        logger.debug("Device state: %r", device)
+        assert device['id'] == device_id, f"Device ID mismatch after {operation}"
         
         # 2. Verify the current song matches expected
         current_song = device.get('current_song')
-        print(f"  Current song in DynamoDB: {current_song}")
+        logger.debug("Current song in DynamoDB: %r", current_song)
         assert current_song == expected_song, \
             f"Song mismatch after {operation}. Expected {expected_song}, got {current_song}"
         
+        # Without check_status no request was sent
+        if status_future is None:
+            return
+        
         # 3. Verify via status request
-        print(f"  Making status request to verify song...")
-        status_response = requests.post(
-            f"{REST_API_URL}/chat",
-            json={
-                "message": "What's playing now?",
-                "customerId": customer_id
-            }
+        status_response = status_future.result()
+    logger.debug("Status response: %s", status_response.text)
+    assert status_response.status_code == 200, f"Status request failed after {operation}"
+    status_data = orjson.loads(status_response.content)
+    assert expected_song in status_data.get('message', ''), \
+        f"Status response doesn't mention current song after {operation}"
+
+@contextmanager
+def seeded_customer(table: Table, customer_id: str, level: str, **device: str) -> Iterator[Table]:
+    """
+    Seed the customer's service level and device attributes for the duration of a block.
+    
+    Afterwards the level is restored to premium and each seeded device
+    attribute to its initial value from INITIAL_DEVICE_STATE.
+    
+    Args:
+        table: The customers table
+        customer_id: The ID of the customer to seed
+        level: The service level to set
+        **device: Device attributes to set, e.g. power='on'
+        
+    Yields:
+        The customers table
+    """
+    def seed(level: str, device: Dict[str, str]) -> None:
+        assignments = ["#lvl = :lvl"]
+        names = {'#lvl': 'level'}
+        values = {':lvl': level}
+        for attr, value in device.items():
+            assignments.append(f"#device.#{attr} = :{attr}")
+            names['#device'] = 'device'
+            names[f'#{attr}'] = attr
+            values[f':{attr}'] = value
+        table.update_item(
+            Key={'id': customer_id},
+            UpdateExpression="SET " + ", ".join(assignments),
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues=values
         )
-        print(f"  Status response: {json.dumps(status_response.json(), indent=2)}")
-        assert status_response.status_code == 200, f"Status request failed after {operation}"
-        status_data = status_response.json()
-        assert expected_song in status_data.get('message', ''), \
-            f"Status response doesn't mention current song after {operation}"
     
-    # Step 1: Verify premium user cannot change songs
-    initial_song = "Test Song 1"
-    print("\n🔒 Testing premium user permissions...")
+    seed(level, device)
+    try:
+        yield table
+    finally:
+        seed('premium', {attr: INITIAL_DEVICE_STATE[attr] for attr in device})
+
+@pytest.fixture(scope="session", autouse=True)
+def status_executor() -> Iterator[ThreadPoolExecutor]:
+    """
+    Shut down the status request executor once the test session ends.
+    
+    Yields:
+        The executor used for background status requests
+    """
+    yield STATUS_EXECUTOR
+    STATUS_EXECUTOR.shutdown(wait=True)
+
+@pytest.fixture
+def premium_customer(test_data: Dict[str, str], dynamodb_client: DynamoDBServiceResource) -> Iterator[Table]:
+    """
+    Start the test from the premium service level, and restore it afterwards.
+    
+    Args:
+        test_data: Dictionary containing test customer and device IDs
+        dynamodb_client: Shared DynamoDB resource
+        
+    Yields:
+        The customers table
+    """
+    with seeded_customer(dynamodb_client.Table(CUSTOMERS_TABLE), test_data['customer_id'], 'premium') as table:
+        yield table
+
+@pytest.fixture
+def enterprise_speaker(test_data: Dict[str, str], dynamodb_client: DynamoDBServiceResource) -> Iterator[Table]:
+    """
+    Seed the test customer as an enterprise user whose speaker is on and playing the first song.
+    
+    Each song test starts from this state, so the tests do not depend on
+    one another and can run in any order or in parallel. The customer's
+    initial premium, powered-off state is restored afterwards.
+    
+    Args:
+        test_data: Dictionary containing test customer and device IDs
+        dynamodb_client: Shared DynamoDB resource
+        
+    Yields:
+        The customers table
+    """
+    with seeded_customer(
+        dynamodb_client.Table(CUSTOMERS_TABLE), test_data['customer_id'], 'enterprise',
+        power='on', current_song=SONG_PLAYLIST[0]
+    ) as table:
+        yield table
+
+@contextmanager
+def restored_customer(table: Table, customer_id: str) -> Iterator[Table]:
+    """
+    Snapshot the customer item and put it back unchanged once the block exits.
+    
+    Args:
+        table: The customers table
+        customer_id: The ID of the customer to snapshot
+        
+    Yields:
+        The customers table
+    """
+    snapshot = table.get_item(Key={'id': customer_id}, ConsistentRead=True).get('Item')
+    if snapshot is None:
+        pytest.fail(f"Customer {customer_id} not found")
+    try:
+        yield table
+    finally:
+        table.put_item(Item=snapshot)
+
+@contextmanager
+def basic_level_customer(table: Table, customer_id: str) -> Iterator[Table]:
+    """
+    Move a premium customer to the basic level for the duration of a block.
+    
+    The customer item is snapshotted first and put back unchanged afterwards.
+    
+    Args:
+        table: The customers table
+        customer_id: The ID of the customer, expected to be at the premium level
+        
+    Yields:
+        The customers table
+    """
+    with restored_customer(table, customer_id):
+        set_service_level(table, customer_id, 'basic', from_level='premium')
+        yield table
+
+def test_song_control_requires_enterprise(test_data: Dict[str, str], premium_customer: Table, http: requests.Session) -> None:
+    """
+    Test that premium users cannot change songs.
+    
+    Args:
+        test_data: Dictionary containing test customer and device IDs
+        premium_customer: Customers table, with the customer at the premium level
+        http: Shared HTTP session
+    """
+    customer_id = test_data['customer_id']
+    logger.debug("Testing premium user permissions")
     
     # Try to play next song as premium user
-    response = requests.post(
-        f"{REST_API_URL}/chat",
-        json={
-            "message": "Play next song",
-            "customerId": customer_id
-        }
+    response = http.post(
+        CHAT_URL,
+        data=chat_body(customer_id, MESSAGES["next_song"]),
+        headers=JSON_HEADERS,
+        timeout=CHAT_TIMEOUT
     )
-    print(f"Premium user response: {json.dumps(response.json(), indent=2)}")
+    logger.debug("Premium user response: %s", response.text)
     assert response.status_code == 200
-    assert any(phrase in response.json()['message'].lower() for phrase in 
-              ["only available with", "enterprise service plan", "please upgrade"]), \
+    assert UPGRADE_RE.search(orjson.loads(response.content)['message'].lower()), \
         "Response should indicate that song control requires enterprise plan"
-    verify_song_state(initial_song, "premium user song change attempt")
+    # Song control is denied, so only the DynamoDB state is checked
+    verify_song_state(
+        http, premium_customer, customer_id, test_data['device_id'], INITIAL_DEVICE_STATE['current_song'],
+        "premium user song change attempt", check_status=False
+    )
+
+def test_song_changes_action(test_data: Dict[str, str], enterprise_speaker: Table, http: requests.Session) -> None:
+    """
+    Test the song_control action through the chat API.
     
-    # Step 2: Upgrade to enterprise
-    print("\n⬆️ Upgrading to enterprise service level...")
-    try:
-        # Update service level directly in DynamoDB
-        update_response = table.update_item(
-            Key={'id': customer_id},
-            UpdateExpression="SET #lvl = :val",
-            ExpressionAttributeNames={'#lvl': 'level'},
-            ExpressionAttributeValues={':val': 'enterprise'},
-            ReturnValues="UPDATED_NEW"
-        )
-        print(f"DynamoDB update response: {json.dumps(update_response, indent=2, cls=DynamoDBEncoder)}")
-        print("✅ Upgraded to enterprise service level")
-        
-        # Wait for the change to propagate
-        time.sleep(2)
-    except Exception as e:
-        print(f"❌ Failed to upgrade service level: {e}")
-        raise
-    
-    # Step 3: Test specific song requests
-    print("\n🎯 Testing specific song selection...")
-    
-    # Test different phrasings for specific song requests
-    test_cases = [
-        ("Play Test Song 2", "Test Song 2"),
-        ("Put on Test Song 2", "Test Song 2"),
-        ("Switch to Test Song 3", "Test Song 3"),
-        ("Change song to Test Song 2", "Test Song 2")
-    ]
-    
-    for command, expected_song in test_cases:
-        print(f"\nTesting command: {command}")
-        response = requests.post(
-            f"{REST_API_URL}/chat",
-            json={
-                "message": command,
-                "customerId": customer_id
-            }
-        )
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
-        assert response.status_code == 200
-        assert expected_song in response.json()['message']
-        verify_song_state(expected_song, f"play specific song ({command})")
-    
-    # Try to play a non-existent song
-    print("\n❌ Testing non-existent song request...")
-    response = requests.post(
-        f"{REST_API_URL}/chat",
-        json={
-            "message": "Play NonexistentSong",
-            "customerId": customer_id
-        }
+    This test verifies that, for an enterprise user:
+    1. Requests for non-existent songs are handled
+    2. Song changes are refused while the device is powered off
+    
+    Permission checks and the individual song commands are covered by
+    test_song_control_requires_enterprise and the parametrized test_song_*
+    tests below.
+    
+    Args:
+        test_data: Dictionary containing test customer and device IDs
+        enterprise_speaker: Customers table, seeded with an enterprise customer
+        http: Shared HTTP session
+    """
+    # Get customer ID from test data fixture
+    customer_id = test_data['customer_id']
+    logger.debug("Starting song control test for customer %s", customer_id)
+    table = enterprise_speaker
+    
+    # Step 1: Try to play a non-existent song
+    logger.debug("Testing non-existent song request")
+    response = http.post(
+        CHAT_URL,
+        data=chat_body(customer_id, "Play NonexistentSong"),
+        headers=JSON_HEADERS,
+        timeout=CHAT_TIMEOUT
     )
-    print(f"Non-existent song response: {json.dumps(response.json(), indent=2)}")
+    logger.debug("Non-existent song response: %s", response.text)
     assert response.status_code == 200
-    assert "Could not find a song" in response.json()['message']
-    verify_song_state("Test Song 2", "play non-existent song")
-    
-    # Step 4: Test next/previous functionality with various phrasings
-    print("\n⏭️ Testing next song functionality with different phrasings...")
-    next_commands = [
-        "Play next song",
-        "Skip this song",
-        "Skip to next",
-        "Play something different",
-        "Change song",
-        "Next song"
-    ]
-    
-    # Track current position in playlist
-    playlist = ["Test Song 1", "Test Song 2", "Test Song 3", "Test Song 4"]
-    current_index = playlist.index("Test Song 2")  # We start at Test Song 2
-    
-    for command in next_commands:
-        print(f"\nTesting command: {command}")
-        response = requests.post(
-            f"{REST_API_URL}/chat",
-            json={
-                "message": command,
-                "customerId": customer_id
-            }
-        )
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
-        assert response.status_code == 200
-        
-        # Move to next song (with wraparound)
-        current_index = (current_index + 1) % len(playlist)
-        expected_song = playlist[current_index]
-        
-        assert expected_song in response.json()['message']
-        verify_song_state(expected_song, f"next song command ({command})")
-    
-    # Test previous song functionality with different phrasings
-    print("\n⏮️ Testing previous song functionality with different phrasings...")
-    previous_commands = [
-        "Play previous song",
-        "Go back to previous track",
-        "Play the previous song",
-        "Previous song"
-    ]
-    
-    for command in previous_commands:
-        print(f"\nTesting command: {command}")
-        response = requests.post(
-            f"{REST_API_URL}/chat",
-            json={
-                "message": command,
-                "customerId": customer_id
-            }
-        )
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
-        assert response.status_code == 200
-        
-        # Move to previous song (with wraparound)
-        current_index = (current_index - 1) % len(playlist)
-        expected_song = playlist[current_index]
-        
-        assert expected_song in response.json()['message']
-        verify_song_state(expected_song, f"previous song command ({command})")
-    
-    # Test edge cases
-    print("\n🔄 Testing edge cases...")
-    edge_cases = [
-        "Can you play the next song please?",
-        "PLAY NEXT SONG",
-        "play something else",
-        "i don't like this song"
-    ]
-    
-    for command in edge_cases:
-        print(f"\nTesting edge case: {command}")
-        response = requests.post(
-            f"{REST_API_URL}/chat",
-            json={
-                "message": command,
-                "customerId": customer_id
-            }
-        )
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
-        
-        # Move to next song (with wraparound)
-        current_index = (current_index + 1) % len(playlist)
-        expected_song = playlist[current_index]
-        
-        assert response.status_code == 200
-        assert expected_song in response.json()['message']
-        verify_song_state(expected_song, f"edge case ({command})")
+    assert "Could not find a song" in orjson.loads(response.content)['message']
+    verify_song_state(http, table, customer_id, test_data['device_id'], SONG_PLAYLIST[0], "play non-existent song")
     
-    # Step 5: Test error cases
-    print("\n🔌 Testing device power off scenario...")
+    # Step 2: Test error cases
+    logger.debug("Testing device power off scenario")
     # Turn off the device
-    response = requests.post(
-        f"{REST_API_URL}/chat",
-        json={
-            "message": "Turn off the device",
-            "customerId": customer_id
-        }
+    response = http.post(
+        CHAT_URL,
+        data=chat_body(customer_id, "Turn off the device"),
+        headers=JSON_HEADERS,
+        timeout=CHAT_TIMEOUT
     )
-    print(f"Device power off response: {json.dumps(response.json(), indent=2)}")
+    logger.debug("Device power off response: %s", response.text)
     assert response.status_code == 200
-    time.sleep(2)
+    wait_for_item(table, customer_id, lambda item: item.get('device', {}).get('power') == 'off')
     
     # Try to change song while device is off
-    print("\n❌ Testing song change with powered off device...")
-    response = requests.post(
-        f"{REST_API_URL}/chat",
-        json={
-            "message": "Play next song",
-            "customerId": customer_id
-        }
+    logger.debug("Testing song change with powered off device")
+    response = http.post(
+        CHAT_URL,
+        data=chat_body(customer_id, MESSAGES["next_song"]),
+        headers=JSON_HEADERS,
+        timeout=CHAT_TIMEOUT
     )
-    print(f"Powered off song change response: {json.dumps(response.json(), indent=2)}")
+    logger.debug("Powered off song change response: %s", response.text)
     assert response.status_code == 200
-    assert "powered off" in response.json()['message']
+    assert "powered off" in orjson.loads(response.content)['message']
     
-    print("✅ Song control tests completed successfully")
+    logger.debug("Song control tests completed")
 
-def test_service_level_permissions(test_data: Dict[str, str]) -> None:
+@pytest.mark.parametrize("command,expected_song", SPECIFIC_SONG_CASES)
+def test_song_specific_play(command: str, expected_song: str, test_data: Dict[str, str], enterprise_speaker: Table, http: requests.Session) -> None:
     """
-    Test service level permissions through the chat API.
+    Test that a request for a specific song plays that song.
     
-    This test verifies that:
-    1. Basic service level users cannot access premium features
-    2. Premium service level users can access premium features
+    Args:
+        command: The chat message requesting the song
+        expected_song: The song expected to be playing afterwards
+        test_data: Dictionary containing test customer and device IDs
+        enterprise_speaker: Customers table, seeded with an enterprise customer
+        http: Shared HTTP session
+    """
+    customer_id = test_data['customer_id']
+    message_text = send_chat(http, customer_id, command)
+    assert expected_song.lower() in message_text, f"Response to '{command}' should mention {expected_song}"
+    verify_song_state(
+        http, enterprise_speaker, customer_id, test_data['device_id'],
+        expected_song, f"play specific song ({command})"
+    )
+
+@pytest.mark.parametrize("command", NEXT_SONG_COMMANDS + NEXT_SONG_EDGE_CASES)
+def test_song_next(command: str, test_data: Dict[str, str], enterprise_speaker: Table, http: requests.Session) -> None:
+    """
+    Test that each phrasing of a next-song request advances the playlist by one.
     
     Args:
+        command: The chat message requesting the next song
         test_data: Dictionary containing test customer and device IDs
+        enterprise_speaker: Customers table, seeded with an enterprise customer
+        http: Shared HTTP session
     """
-    # Get customer ID from test data fixture
     customer_id = test_data['customer_id']
-    logger.info(f"Starting service level permissions test for customer {customer_id}")
+    expected_song = SONG_PLAYLIST[1]
+    message_text = send_chat(http, customer_id, command)
+    assert expected_song.lower() in message_text, f"Response to '{command}' should mention {expected_song}"
+    verify_song_state(
+        http, enterprise_speaker, customer_id, test_data['device_id'],
+        expected_song, f"next song command ({command})"
+    )
+
+@pytest.mark.parametrize("command", PREVIOUS_SONG_COMMANDS)
+def test_song_previous(command: str, test_data: Dict[str, str], enterprise_speaker: Table, http: requests.Session) -> None:
+    """
+    Test that each phrasing of a previous-song request wraps from the first song to the last.
+    
+    Args:
+        command: The chat message requesting the previous song
+        test_data: Dictionary containing test customer and device IDs
+        enterprise_speaker: Customers table, seeded with an enterprise customer
+        http: Shared HTTP session
+    """
+    customer_id = test_data['customer_id']
+    expected_song = SONG_PLAYLIST[-1]
+    message_text = send_chat(http, customer_id, command)
+    assert expected_song.lower() in message_text, f"Response to '{command}' should mention {expected_song}"
+    verify_song_state(
+        http, enterprise_speaker, customer_id, test_data['device_id'],
+        expected_song, f"previous song command ({command})"
+    )
+
+def test_song_next_batch(test_data: Dict[str, str], enterprise_speaker: Table, http: requests.Session) -> None:
+    """
+    Test that next-song commands sent in batches are applied in order, wrapping around the playlist.
     
-    # Create DynamoDB client
-    dynamodb = boto3.resource('dynamodb', region_name=REGION)
-    customers_table = dynamodb.Table(CUSTOMERS_TABLE)
+    Args:
+        test_data: Dictionary containing test customer and device IDs
+        enterprise_speaker: Customers table, seeded with an enterprise customer
+        http: Shared HTTP session
+    """
+    customer_id = test_data['customer_id']
     
-    try:
-        # First, ensure we start with a known state by setting to premium
-        logger.info("Setting initial service level to premium")
-        update_response = customers_table.update_item(
-            Key={'id': customer_id},
-            UpdateExpression="SET #lvl = :val",
-            ExpressionAttributeNames={'#lvl': 'level'},
-            ExpressionAttributeValues={':val': 'premium'},
-            ReturnValues="UPDATED_NEW"
-        )
-        logger.info(f"Update response: {update_response}")
-        
-        # Wait for the change to propagate
-        time.sleep(2)
-        
-        # Verify the customer is now premium
-        response = customers_table.get_item(Key={'id': customer_id})
-        assert 'Item' in response, f"Customer {customer_id} not found"
-        customer = response['Item']
-        assert customer.get('level') == 'premium', "Failed to set customer to premium service level"
-        logger.info("Successfully set customer to premium service level")
-        
-        # First, ensure the device is powered on
-        power_response = requests.post(
-            f"{REST_API_URL}/chat",
-            json={
-                "customerId": customer_id,
-                "message": "Turn on my speaker"
-            }
-        )
-        
-        # Check for 502 Bad Gateway error (known issue)
-        if power_response.status_code == 502:
-            pytest.skip("Chat endpoint returned 502 Bad Gateway error (known issue)")
-            
-        # Verify power on was successful
-        assert power_response.status_code == 200
-        power_data = power_response.json()
-        assert "on" in power_data["message"].lower()
-        
-        # Wait a moment for the power state to update
-        time.sleep(2)
-        
-        # Test premium feature access (e.g., volume control)
-        logger.info("Testing premium feature access")
-        premium_response = requests.post(
-            f"{REST_API_URL}/chat",
-            json={
-                "customerId": customer_id,
-                "message": "Set the volume to 80"
-            }
-        )
-        
-        # Check for 502 Bad Gateway error (known issue)
-        if premium_response.status_code == 502:
-            pytest.skip("Chat endpoint returned 502 Bad Gateway error (known issue)")
-        
-        # Verify premium access works
-        assert premium_response.status_code == 200, \
-            f"Expected status code 200 for premium access, got {premium_response.status_code}"
-        premium_data = premium_response.json()
-        assert "message" in premium_data, "Response should contain 'message' field"
-        premium_message = premium_data["message"].lower()
-        assert "volume" in premium_message and "80" in premium_message, \
-            "Premium user should be able to control volume"
-        logger.info("Premium feature access test successful")
-        
-        # Now change to basic service level
-        logger.info("Changing to basic service level")
-        update_response = customers_table.update_item(
-            Key={'id': customer_id},
-            UpdateExpression="SET #lvl = :val",
-            ExpressionAttributeNames={'#lvl': 'level'},
-            ExpressionAttributeValues={':val': 'basic'},
-            ReturnValues="UPDATED_NEW"
-        )
-        logger.info(f"Service level update response: {update_response}")
-        
-        # Wait a moment for the change to propagate
-        time.sleep(2)
-        
-        # Verify the change was successful
-        response = customers_table.get_item(Key={'id': customer_id})
-        assert response.get('Item', {}).get('level') == 'basic', "Failed to change service level to basic"
-        logger.info("Successfully changed to basic service level")
-        
-        # Test the same feature with basic service level
-        logger.info("Testing basic service level access")
-        basic_response = requests.post(
-            f"{REST_API_URL}/chat",
-            json={
-                "customerId": customer_id,
-                "message": "Set the volume to 80"
-            }
-        )
-        
-        # Check for 502 Bad Gateway error (known issue)
-        if basic_response.status_code == 502:
-            pytest.skip("Chat endpoint returned 502 Bad Gateway error (known issue)")
-        
-        # Verify basic access is restricted
-        assert basic_response.status_code == 200, \
-            f"Expected status code 200 for basic access, got {basic_response.status_code}"
-        basic_data = basic_response.json()
-        assert "message" in basic_data, "Response should contain 'message' field"
-        basic_message = basic_data["message"].lower()
-        assert any(phrase in basic_message for phrase in 
-                  ["premium", "upgrade", "not available", "basic", "not allowed"]), \
-            "Basic user should be notified of service level restriction"
-        logger.info("Basic service level restriction test successful")
-        
-    finally:
-        # Restore premium service level
-        try:
-            logger.info("Restoring premium service level")
-            customers_table.update_item(
-                Key={'id': customer_id},
-                UpdateExpression="SET #lvl = :val",
-                ExpressionAttributeNames={'#lvl': 'level'},
-                ExpressionAttributeValues={':val': 'premium'}
-            )
-            logger.info("Successfully restored premium service level")
-        except Exception as e:
-            logger.error(f"Warning: Failed to restore premium service level: {e}")
+    # Send the next-song commands in small batch requests; each batch is processed in order
+    results: List[Dict[str, Any]] = []
+    for start in range(0, len(NEXT_SONG_COMMANDS), CHAT_BATCH_SIZE):
+        results.extend(send_chat_batch(http, customer_id, NEXT_SONG_COMMANDS[start:start + CHAT_BATCH_SIZE]))
+    for position, (command, result) in enumerate(zip(NEXT_SONG_COMMANDS, results), start=1):
+        logger.debug("Response: %r", result)
+        expected_song = SONG_PLAYLIST[position % len(SONG_PLAYLIST)]
+        assert expected_song in result['message'], \
+            f"Response to '{command}' should mention {expected_song}"
+    verify_song_state(
+        http, enterprise_speaker, customer_id, test_data['device_id'],
+        expected_song, "next song commands (batch)"
+    )
 
-def test_basic_service_level_device_power(test_data: Dict[str, str]) -> None:
+def test_service_level_permissions(test_data: Dict[str, str], premium_customer: Table, http: requests.Session) -> None:
     """
-    Test that basic service level users can control device power.
+    Test that premium service level users can access premium features.
     
-    This test verifies that basic service level users can:
-    1. Turn devices on and off
-    2. Check device status
+    Refusals at the basic level are covered by
+    TestBasicServiceLevel.test_restricted_command.
     
     Args:
         test_data: Dictionary containing test customer and device IDs
+        premium_customer: Customers table, with the customer at the premium level
+        http: Shared HTTP session
     """
     # Get customer ID from test data fixture
     customer_id = test_data['customer_id']
+    logger.info("Starting service level permissions test for customer %s", customer_id)
     
-    # Create DynamoDB client
-    dynamodb = boto3.resource('dynamodb', region_name=REGION)
-    customers_table = dynamodb.Table(CUSTOMERS_TABLE)
+    # The premium_customer fixture starts the test at the premium level and restores it afterwards
+    customers_table = premium_customer
     
-    try:
-        # First, verify the customer exists and is premium
-        response = customers_table.get_item(Key={'id': customer_id})
-        assert 'Item' in response, f"Customer {customer_id} not found"
-        customer = response['Item']
-        assert customer['level'] == 'premium', "Test customer should start with premium service level"
+    # First, ensure the device is powered on; seeded directly since only
+    # volume control is under test here
+    set_device_power(customers_table, customer_id, 'on')
+    
+    # Test premium feature access (e.g., volume control)
+    logger.info("Testing premium feature access")
+    premium_message = send_chat(http, customer_id, MESSAGES["set_volume_80"])
+    
+    # Verify premium access works
+    assert "volume" in premium_message and "80" in premium_message, \
+        "Premium user should be able to control volume"
+    logger.info("Premium feature access test successful")
+
+@pytest.mark.xdist_group("basic_level")
+class TestBasicServiceLevel:
+    """
+    Chat flows for a basic service level customer.
+    
+    The tests share one switch to the basic level, made by the class-scoped
+    basic_customer fixture, and run in order against the same device; under
+    pytest-xdist's loadgroup distribution they stay on one worker.
+    """
+    
+    @pytest.fixture(scope="class")
+    def basic_customer(self, test_data: Dict[str, str], dynamodb_client: DynamoDBServiceResource) -> Iterator[Table]:
+        """
+        Switch the test customer from premium to basic for the tests in this class.
         
-        # Change to basic service level
-        update_response = customers_table.update_item(
-            Key={'id': customer_id},
-            UpdateExpression="SET #lvl = :val",
-            ExpressionAttributeNames={'#lvl': 'level'},
-            ExpressionAttributeValues={':val': 'basic'},
-            ReturnValues="UPDATED_NEW"
-        )
+        Args:
+            test_data: Dictionary containing test customer and device IDs
+            dynamodb_client: Shared DynamoDB resource
+            
+        Yields:
+            The customers table
+        """
+        with basic_level_customer(dynamodb_client.Table(CUSTOMERS_TABLE), test_data['customer_id']) as table:
+            yield table
+    
+    def test_device_power(self, test_data: Dict[str, str], basic_customer: Table, http: requests.Session) -> None:
+        """
+        Test that basic service level users can control device power.
         
-        # Wait a moment for the change to propagate
-        time.sleep(2)
+        Args:
+            test_data: Dictionary containing test customer and device IDs
+            basic_customer: Customers table, with the customer at the basic level
+            http: Shared HTTP session
+        """
+        # Get customer ID from test data fixture
+        customer_id = test_data['customer_id']
         
         # Test power control with basic service level
-        power_response = requests.post(
-            f"{REST_API_URL}/chat",
-            json={
-                "customerId": customer_id,
-                "message": "Turn on my speaker"
-            }
-        )
-        
-        # Check for 502 Bad Gateway error (known issue)
-        if power_response.status_code == 502:
-            pytest.skip("Chat endpoint returned 502 Bad Gateway error (known issue)")
+        power_message = send_chat(http, customer_id, MESSAGES["power_on"])
         
         # Verify basic user can control power
-        assert power_response.status_code == 200, \
-            f"Expected status code 200 for basic power control, got {power_response.status_code}"
-        power_data = power_response.json()
-        assert "message" in power_data, "Response should contain 'message' field"
-        power_message = power_data["message"].lower()
-        assert "on" in power_message, "Basic user should be able to turn device on"
-        assert not any(phrase in power_message for phrase in 
-                      ["premium", "upgrade", "not available", "not allowed"]), \
+        assert says_power_on(power_message), "Basic user should be able to turn device on"
+        assert not POWER_RESTRICT_RE.search(power_message), \
             "Basic user should not see service level restrictions for power control"
         
         # Verify the device state was updated
-        verify_response = customers_table.get_item(Key={'id': customer_id})
+        verify_response = wait_for_item(
+            basic_customer, customer_id, lambda item: item.get('device', {}).get('power') == 'on'
+        )
         assert 'Item' in verify_response, "Failed to verify device state"
         device = verify_response['Item'].get('device', {})
         assert device.get('power') == 'on', "Device should be turned on"
-        
-    finally:
-        # Restore premium service level
-        try:
-            customers_table.update_item(
-                Key={'id': customer_id},
-                UpdateExpression="SET #lvl = :val",
-                ExpressionAttributeNames={'#lvl': 'level'},
-                ExpressionAttributeValues={':val': 'premium'}
-            )
-        except Exception as e:
-            print(f"Warning: Failed to restore premium service level: {e}")
-
-def test_basic_user_device_flow(test_data):
-    """
-    Test the complete flow for a basic user interacting with their device.
     
-    This test verifies that a basic user can:
-    1. Check the status of their device
-    2. Turn the device off
-    3. Check the status again to confirm it's off
-    
-    This ensures the full interaction loop works correctly.
-    """
-    # Get customer ID from test data fixture
-    customer_id = test_data['customer_id']
-    device_id = test_data['device_id']
-    
-    # Create DynamoDB client
-    dynamodb = boto3.resource('dynamodb', region_name=REGION)
-    customers_table_name = CUSTOMERS_TABLE
-    table = dynamodb.Table(customers_table_name)
-    
-    # Get initial state
-    try:
-        initial_response = table.get_item(Key={'id': customer_id})
-        initial_state = initial_response.get('Item', {}).get('device', {})
-        print(f"Captured initial device state: {initial_state}")
-    except Exception as e:
-        print(f"Warning: Failed to capture initial state: {e}")
-        initial_state = {}
-    
-    # Temporarily change the service level to basic
-    try:
-        response = boto3.client('dynamodb', region_name=REGION).update_item(
-            TableName=customers_table_name,
-            Key={'id': {'S': customer_id}},
-            UpdateExpression="SET #level = :val",
-            ExpressionAttributeNames={'#level': 'level'},
-            ExpressionAttributeValues={':val': {'S': 'basic'}},
-            ReturnValues="UPDATED_NEW"
-        )
-        print(f"Updated service level to basic: {response}")
-        
-        # Step 1: Check the initial status of the device
-        status_message = "What's the status of my speaker?"
-        status_body = {
-            "customerId": customer_id,
-            "message": status_message
-        }
-        
-        status_response = requests.post(
-            f"{REST_API_URL}/chat",
-            json=status_body
-        )
+    def test_device_flow(self, test_data: Dict[str, str], basic_customer: Table, http: requests.Session) -> None:
+        """
+        Test the complete flow for a basic user interacting with their device.
         
-        # Check for 502 Bad Gateway error (known issue)
-        if status_response.status_code == 502:
-            pytest.skip("Chat endpoint returned 502 Bad Gateway error (known issue)")
+        This test verifies that a basic user can:
+        1. Check the status of their device
+        2. Turn the device off
+        3. Check the status again to confirm it's off
         
-        # Verify response status code
-        assert status_response.status_code == 200, f"Expected status code 200, got {status_response.status_code}: {status_response.text}"
+        Args:
+            test_data: Dictionary containing test customer and device IDs
+            basic_customer: Customers table, with the customer at the basic level
+            http: Shared HTTP session
+        """
+        # Get customer ID from test data fixture
+        customer_id = test_data['customer_id']
         
-        # Parse response body
-        status_data = status_response.json()
-        
-        # Verify response contains device status information
-        assert "message" in status_data, "Response should contain 'message' field"
-        status_message_text = status_data["message"].lower()
-        print(f"Initial status check response: {status_message_text}")
+        # Step 1: Check the initial status of the device
+        status_message_text = send_chat(http, customer_id, MESSAGES["status"])
+        logger.debug("Initial status check response: %s", status_message_text)
         
         # Step 2: Turn off the device
-        turn_off_message = "Turn off my speaker"
-        turn_off_body = {
-            "customerId": customer_id,
-            "message": turn_off_message
-        }
+        turn_off_message_text = send_chat(http, customer_id, MESSAGES["power_off"])
+        assert POWER_OFF_RE.search(turn_off_message_text), "Response should confirm the device was turned off"
+        logger.debug("Turn off response: %s", turn_off_message_text)
         
-        turn_off_response = requests.post(
-            f"{REST_API_URL}/chat",
-            json=turn_off_body
+        # wait_for_item's strongly consistent read returns as soon as the
+        # power change is visible, which is normally the first read
+        off_response = wait_for_item(
+            basic_customer, customer_id, lambda item: item.get('device', {}).get('power') == 'off'
         )
-        
-        # Check for 502 Bad Gateway error (known issue)
-        if turn_off_response.status_code == 502:
-            pytest.skip("Chat endpoint returned 502 Bad Gateway error (known issue)")
-        
-        # Verify response status code
-        assert turn_off_response.status_code == 200, f"Expected status code 200, got {turn_off_response.status_code}: {turn_off_response.text}"
-        
-        # Parse response body
-        turn_off_data = turn_off_response.json()
-        
-        # Verify response indicates the device was turned off
-        assert "message" in turn_off_data, "Response should contain 'message' field"
-        turn_off_message_text = turn_off_data["message"].lower()
-        assert "off" in turn_off_message_text, "Response should confirm the device was turned off"
-        print(f"Turn off response: {turn_off_message_text}")
-        
-        # Wait a moment for the change to propagate
-        time.sleep(2)
+        assert off_response.get('Item', {}).get('device', {}).get('power') == 'off', \
+            "Device should be turned off in DynamoDB"
         
         # Step 3: Check the status again to verify it's off
-        status_again_message = "What's the current status of my speaker?"
-        status_again_body = {
-            "customerId": customer_id,
-            "message": status_again_message
-        }
-        
-        status_again_response = requests.post(
-            f"{REST_API_URL}/chat",
-            json=status_again_body
-        )
-        
-        # Check for 502 Bad Gateway error (known issue)
-        if status_again_response.status_code == 502:
-            pytest.skip("Chat endpoint returned 502 Bad Gateway error (known issue)")
-        
-        # Verify response status code
-        assert status_again_response.status_code == 200, f"Expected status code 200, got {status_again_response.status_code}: {status_again_response.text}"
-        
-        # Parse response body
-        status_again_data = status_again_response.json()
-        
-        # Verify response contains updated device status information
-        assert "message" in status_again_data, "Response should contain 'message' field"
-        status_again_message_text = status_again_data["message"].lower()
-        assert "off" in status_again_message_text, "Response should indicate the device is now off"
-        assert "on" not in status_again_message_text or ("not" in status_again_message_text and "on" in status_again_message_text), \
+        status_again_message_text = send_chat(http, customer_id, "What's the current status of my speaker?")
+        assert POWER_OFF_RE.search(status_again_message_text), "Response should indicate the device is now off"
+        assert not says_power_on(status_again_message_text), \
             f"Response should not indicate the device is on (unless saying it's not on): {status_again_message_text}"
-        print(f"Final status check response: {status_again_message_text}")
+        logger.debug("Final status check response: %s", status_again_message_text)
+    
+    @pytest.mark.parametrize("command", BASIC_RESTRICTED_COMMANDS)
+    def test_restricted_command(self, command: str, test_data: Dict[str, str], basic_customer: Table, http: requests.Session) -> None:
+        """
+        Test that basic service level users are refused premium and enterprise features.
         
-    finally:
-        # Restore the original service level (premium)
-        try:
-            response = boto3.client('dynamodb', region_name=REGION).update_item(
-                TableName=customers_table_name,
-                Key={'id': {'S': customer_id}},
-                UpdateExpression="SET #level = :val",
-                ExpressionAttributeNames={'#level': 'level'},
-                ExpressionAttributeValues={':val': {'S': 'premium'}},
-                ReturnValues="UPDATED_NEW"
-            )
-            print(f"Restored service level to premium: {response}")
-            
-            # Restore initial device state if we have it
-            if initial_state:
-                try:
-                    response = table.update_item(
-                        Key={'id': customer_id},
-                        UpdateExpression="set #device = :device",
-                        ExpressionAttributeNames={"#device": "device"},
-                        ExpressionAttributeValues={":device": initial_state},
-                        ReturnValues="UPDATED_NEW"
-                    )
-                    print(f"Restored device state: {response}")
-                except Exception as e:
-                    print(f"Warning: Failed to restore device state: {e}")
-            
-            # Turn the device back on using the chat API as a fallback
-            try:
-                turn_on_body = {
-                    "customerId": customer_id,
-                    "message": "Turn on my speaker"
-                }
-                
-                turn_on_response = requests.post(
-                    f"{REST_API_URL}/chat",
-                    json=turn_on_body
-                )
-                
-                if turn_on_response.status_code == 200:
-                    print("Restored device state to on via chat API")
-                else:
-                    print(f"Warning: Failed to restore device state via chat API: {turn_on_response.status_code}")
-            except Exception as e:
-                print(f"Warning: Failed to restore device state: {e}")
-        except Exception as e:
-            print(f"Warning: Failed to restore service level to premium: {e}") 
\ No newline at end of file
+        Args:
+            command: Chat message asking for a feature above the basic level
+            test_data: Dictionary containing test customer and device IDs
+            basic_customer: Customers table, with the customer at the basic level
+            http: Shared HTTP session
+        """
+        message_text = send_chat(http, test_data['customer_id'], command)
+        assert RESTRICT_RE.search(message_text), \
+            f"Basic user should be notified of service level restriction for '{command}': {message_text}"
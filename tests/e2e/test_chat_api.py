@@ -4,30 +4,58 @@ End-to-end tests for the Agentic Service Bot Chat API endpoints.
 This module tests the chat API endpoints:
 - GET /chat/history/{customerId}
 - POST /chat
+- POST /chat/batch
 """
 
-import os
-import sys
-import json
+import orjson
 import pytest
-import requests
-from pathlib import Path
 
-# Add the project root to the Python path so that imports work correctly
-project_root = Path(__file__).parent.parent.parent
-sys.path.insert(0, str(project_root))
-
-# Set environment variables for testing
-os.environ["ENVIRONMENT"] = "test"
+from tests.e2e._helpers import JSON_HEADERS, check_status, response_json, schema_validator, validate_error
 
 # API URLs for testing
 REST_API_URL = "https://k4w64ym45e.execute-api.us-west-2.amazonaws.com/dev/api"
+CHAT_URL = f"{REST_API_URL}/chat"
+CHAT_BATCH_URL = f"{REST_API_URL}/chat/batch"
+CHAT_HISTORY_URL = REST_API_URL + "/chat/history/{}"
+
+# Request bodies that do not depend on the test customer, encoded once
+INVALID_CUSTOMER_BODY = orjson.dumps({"customerId": "invalid-customer-id", "message": "Hello, what can you do for me?"})
+MISSING_CUSTOMER_BODY = orjson.dumps({"message": "Hello, what can you do for me?"})
+
+# Response schemas, compiled once for every test in the module
+validate_history = schema_validator({
+    "type": "object",
+    "required": ["messages", "customerId"],
+    "properties": {
+        "messages": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["id", "text", "sender", "timestamp", "conversationId"]
+            }
+        }
+    }
+})
+validate_chat_response = schema_validator({
+    "type": "object",
+    "required": ["message", "id", "timestamp", "customerId"]
+})
+validate_batch_response = schema_validator({
+    "type": "object",
+    "required": ["customerId", "results"],
+    "properties": {
+        "results": {
+            "type": "array",
+            "items": {"type": "object", "required": ["message", "id", "timestamp"]}
+        }
+    }
+})
 
 # Remove hardcoded TEST_CUSTOMER_ID
 # TEST_CUSTOMER_ID = "test-customer-e2e-2b24b921"
 
 
-def test_chat_history(test_data):
+def test_chat_history(test_data, http):
     """
     Test the GET /chat/history/{customerId} endpoint.
     
@@ -38,70 +66,45 @@ def test_chat_history(test_data):
     customer_id = test_data['customer_id']
     
     # Make the API request
-    response = requests.get(f"{REST_API_URL}/chat/history/{customer_id}")
-    
-    # Check for 502 Bad Gateway error (known issue)
-    if response.status_code == 502:
-        print("\n⚠️ WARNING: Received 502 Bad Gateway error from chat history endpoint.")
-        print("This is a known issue with the current API deployment.")
-        print("Please check the API logs for more information.")
-        
-        # Still fail the test, but with a more informative message
-        assert False, "Chat history endpoint returned 502 Bad Gateway error (known issue)"
+    response = http.get(CHAT_HISTORY_URL.format(customer_id))
     
     # Verify response status code
-    assert response.status_code == 200, f"Expected status code 200, got {response.status_code}: {response.text}"
+    check_status(response, 200)
     
     # Parse response body
-    data = response.json()
+    data = response_json(response)
     
-    # Verify response structure
-    assert "messages" in data, "Response should contain 'messages' field"
-    assert isinstance(data["messages"], list), "'messages' should be a list"
-    assert "customerId" in data, "Response should contain 'customerId' field"
+    # Verify response structure, including every message
+    validate_history(data)
     assert data["customerId"] == customer_id, f"customerId should be '{customer_id}'"
-    
-    # If there are messages, verify their structure
-    if data["messages"]:
-        message = data["messages"][0]
-        assert "id" in message, "Message should have an 'id'"
-        assert "text" in message, "Message should have 'text'"
-        assert "sender" in message, "Message should have a 'sender'"
-        assert "timestamp" in message, "Message should have a 'timestamp'"
-        assert "conversationId" in message, "Message should have a 'conversationId'"
 
 
-def test_chat_history_invalid_customer():
+@pytest.mark.parametrize("method,url,body", [
+    pytest.param("GET", CHAT_HISTORY_URL.format("invalid-customer-id"), None, id="history"),
+    pytest.param("POST", CHAT_URL, INVALID_CUSTOMER_BODY, id="send-message")
+])
+def test_invalid_customer(method, url, body, http):
     """
-    Test the GET /chat/history/{customerId} endpoint with an invalid customer ID.
+    Test the chat endpoints with an invalid customer ID.
     
-    This test verifies that the endpoint returns a 404 error when
-    an invalid customer ID is provided.
+    This test verifies that GET /chat/history/{customerId} and POST /chat
+    return a 404 error when an invalid customer ID is provided.
     """
     # Make the API request with an invalid customer ID
-    response = requests.get(f"{REST_API_URL}/chat/history/invalid-customer-id")
-    
-    # Check for 502 Bad Gateway error (known issue)
-    if response.status_code == 502:
-        print("\n⚠️ WARNING: Received 502 Bad Gateway error from chat history endpoint.")
-        print("This is a known issue with the current API deployment.")
-        print("Please check the API logs for more information.")
-        
-        # Still fail the test, but with a more informative message
-        assert False, "Chat history endpoint returned 502 Bad Gateway error (known issue)"
+    response = http.request(method, url, data=body, headers=JSON_HEADERS)
     
     # Verify response status code
-    assert response.status_code == 404, f"Expected status code 404, got {response.status_code}: {response.text}"
+    check_status(response, 404)
     
     # Parse response body
-    data = response.json()
+    data = response_json(response)
     
     # Verify error message
-    assert "error" in data, "Response should contain 'error' key"
+    validate_error(data)
     assert "not found" in data["error"].lower(), "Error message should indicate customer not found"
 
 
-def test_send_message(test_data):
+def test_send_message(test_data, http):
     """
     Test the POST /chat endpoint.
     
@@ -119,107 +122,109 @@ def test_send_message(test_data):
     }
     
     # Send the request
-    response = requests.post(
-        f"{REST_API_URL}/chat",
+    response = http.post(
+        CHAT_URL,
         json=body
     )
     
-    # Check for 502 Bad Gateway error (known issue)
-    if response.status_code == 502:
-        print("\n⚠️ WARNING: Received 502 Bad Gateway error from chat endpoint.")
-        print("This is a known issue with the current API deployment.")
-        print("Please check the API logs for more information.")
-        
-        # Still fail the test, but with a more informative message
-        assert False, "Chat endpoint returned 502 Bad Gateway error (known issue)"
-    
     # Verify response status code
-    assert response.status_code == 200, f"Expected status code 200, got {response.status_code}: {response.text}"
+    check_status(response, 200)
     
     # Parse response body
-    data = response.json()
+    data = response_json(response)
     
     # Verify response structure
-    assert "message" in data, "Response should contain 'message' field"
-    assert "id" in data, "Response should contain 'id' field"
-    assert "timestamp" in data, "Response should contain 'timestamp' field"
-    assert "customerId" in data, "Response should contain 'customerId' field"
+    validate_chat_response(data)
     assert data["customerId"] == customer_id, f"customerId should be '{customer_id}'"
 
 
-def test_send_message_invalid_customer():
+def test_send_message_missing_parameters(http):
+    """
+    Test the POST /chat endpoint with missing required parameters.
+    
+    This test verifies that the endpoint returns a 400 error when
+    required parameters are missing.
+    """
+    # Send the request with the customerId missing
+    response = http.post(
+        CHAT_URL,
+        data=MISSING_CUSTOMER_BODY,
+        headers=JSON_HEADERS
+    )
+    
+    # Verify response status code
+    check_status(response, 400)
+    
+    # Parse response body
+    data = response_json(response)
+    
+    # Verify error message
+    validate_error(data)
+    assert "message" in data["error"].lower(), "Error message should indicate missing message parameter" 
+
+
+def test_send_message_batch(test_data, http):
     """
-    Test the POST /chat endpoint with an invalid customer ID.
+    Test the POST /chat/batch endpoint.
     
-    This test verifies that the endpoint returns a 404 error when
-    an invalid customer ID is provided.
+    This test verifies that the endpoint processes several chat messages
+    in order and returns one response per message.
     """
+    # Get customer ID from test data fixture
+    customer_id = test_data['customer_id']
+    
     # Prepare request body
-    message = "Hello, what can you do for me?"
+    messages = [
+        "Hello, what can you do for me?",
+        "What's the status of my speaker?"
+    ]
     body = {
-        "customerId": "invalid-customer-id",
-        "message": message
+        "customerId": customer_id,
+        "messages": messages
     }
     
     # Send the request
-    response = requests.post(
-        f"{REST_API_URL}/chat",
+    response = http.post(
+        CHAT_BATCH_URL,
         json=body
     )
     
-    # Check for 502 Bad Gateway error (known issue)
-    if response.status_code == 502:
-        print("\n⚠️ WARNING: Received 502 Bad Gateway error from chat endpoint.")
-        print("This is a known issue with the current API deployment.")
-        print("Please check the API logs for more information.")
-        
-        # Still fail the test, but with a more informative message
-        assert False, "Chat endpoint returned 502 Bad Gateway error (known issue)"
-    
     # Verify response status code
-    assert response.status_code == 404, f"Expected status code 404, got {response.status_code}: {response.text}"
+    check_status(response, 200)
     
     # Parse response body
-    data = response.json()
+    data = response_json(response)
     
-    # Verify error message
-    assert "error" in data, "Response should contain 'error' key"
-    assert "not found" in data["error"].lower(), "Error message should indicate customer not found"
+    # Verify response structure; each result is shaped like a single chat response
+    validate_batch_response(data)
+    assert data["customerId"] == customer_id, f"customerId should be '{customer_id}'"
+    assert len(data["results"]) == len(messages), "Response should contain one result per message"
 
 
-def test_send_message_missing_parameters():
+def test_send_message_batch_missing_parameters(test_data, http):
     """
-    Test the POST /chat endpoint with missing required parameters.
+    Test the POST /chat/batch endpoint with missing required parameters.
     
     This test verifies that the endpoint returns a 400 error when
-    required parameters are missing.
+    the messages list is missing.
     """
-    # Prepare request body with missing customerId
+    # Prepare request body with missing messages
     body = {
-        "message": "Hello, what can you do for me?"
+        "customerId": test_data['customer_id']
     }
     
     # Send the request
-    response = requests.post(
-        f"{REST_API_URL}/chat",
+    response = http.post(
+        CHAT_BATCH_URL,
         json=body
     )
     
-    # Check for 502 Bad Gateway error (known issue)
-    if response.status_code == 502:
-        print("\n⚠️ WARNING: Received 502 Bad Gateway error from chat endpoint.")
-        print("This is a known issue with the current API deployment.")
-        print("Please check the API logs for more information.")
-        
-        # Still fail the test, but with a more informative message
-        assert False, "Chat endpoint returned 502 Bad Gateway error (known issue)"
-    
     # Verify response status code
-    assert response.status_code == 400, f"Expected status code 400, got {response.status_code}: {response.text}"
+    check_status(response, 400)
     
     # Parse response body
-    data = response.json()
+    data = response_json(response)
     
     # Verify error message
-    assert "error" in data, "Response should contain 'error' key"
-    assert "message" in data["error"].lower(), "Error message should indicate missing message parameter" 
\ No newline at end of file
+    validate_error(data)
+    assert "messages" in data["error"].lower(), "Error message should indicate missing messages parameter"
\ No newline at end of file
@@ -6,28 +6,45 @@ This module tests the customer API endpoints:
 - GET /customers/{customerId}
 """
 
-import os
-import sys
-import json
 import pytest
-import requests
-from pathlib import Path
 
-# Add the project root to the Python path so that imports work correctly
-project_root = Path(__file__).parent.parent.parent
-sys.path.insert(0, str(project_root))
-
-# Set environment variables for testing
-os.environ["ENVIRONMENT"] = "test"
+from tests.e2e._helpers import check_status, response_json, schema_validator, validate_error
 
 # API URLs for testing
 REST_API_URL = "https://k4w64ym45e.execute-api.us-west-2.amazonaws.com/dev/api"
+CUSTOMERS_URL = f"{REST_API_URL}/customers"
+CUSTOMER_URL = REST_API_URL + "/customers/{}"
+
+# Response schemas, compiled once for every test in the module; customers
+# include their service level details
+CUSTOMER_SCHEMA = {
+    "type": "object",
+    "required": ["id", "name", "level", "levelDetails"],
+    "properties": {
+        "levelDetails": {
+            "type": "object",
+            "required": ["level", "allowed_actions"]
+        }
+    }
+}
+validate_customers = schema_validator({
+    "type": "object",
+    "required": ["customers"],
+    "properties": {
+        "customers": {"type": "array", "minItems": 1, "items": CUSTOMER_SCHEMA}
+    }
+})
+validate_customer = schema_validator({
+    "type": "object",
+    "required": ["customer"],
+    "properties": {"customer": CUSTOMER_SCHEMA}
+})
 
 # Remove hardcoded TEST_CUSTOMER_ID
 # TEST_CUSTOMER_ID = "test-customer-e2e-2b24b921"
 
 
-def test_get_customers():
+def test_get_customers(http):
     """
     Test the GET /customers endpoint.
     
@@ -35,38 +52,19 @@ def test_get_customers():
     with the correct structure, including their service levels.
     """
     # Make the API request
-    response = requests.get(f"{REST_API_URL}/customers")
+    response = http.get(CUSTOMERS_URL)
     
     # Verify response status code
-    assert response.status_code == 200, f"Expected status code 200, got {response.status_code}: {response.text}"
+    check_status(response, 200)
     
     # Parse response body
-    data = response.json()
-    
-    # Verify response structure
-    assert "customers" in data, "Response should contain 'customers' key"
-    assert isinstance(data["customers"], list), "'customers' should be a list"
-    
-    # Verify at least one customer is returned
-    assert len(data["customers"]) > 0, "At least one customer should be returned"
-    
-    # Verify customer structure
-    customer = data["customers"][0]
-    assert "id" in customer, "Customer should have 'id' field"
-    assert "name" in customer, "Customer should have 'name' field"
-    assert "level" in customer, "Customer should have 'level' field"
+    data = response_json(response)
     
-    # Verify service level details are included
-    assert "levelDetails" in customer, "Customer should have 'levelDetails' field"
-    assert isinstance(customer["levelDetails"], dict), "'levelDetails' should be an object"
-    
-    # Verify service level details structure
-    level_details = customer["levelDetails"]
-    assert "level" in level_details, "Service level details should have 'level' field"
-    assert "allowed_actions" in level_details, "Service level details should have 'allowed_actions' field"
+    # Verify response structure: at least one customer, each with service level details
+    validate_customers(data)
 
 
-def test_get_customer(test_data):
+def test_get_customer(test_data, http):
     """
     Test the GET /customers/{customerId} endpoint.
     
@@ -77,35 +75,20 @@ def test_get_customer(test_data):
     customer_id = test_data['customer_id']
     
     # Make the API request
-    response = requests.get(f"{REST_API_URL}/customers/{customer_id}")
+    response = http.get(CUSTOMER_URL.format(customer_id))
     
     # Verify response status code
-    assert response.status_code == 200, f"Expected status code 200, got {response.status_code}: {response.text}"
+    check_status(response, 200)
     
     # Parse response body
-    data = response.json()
-    
-    # Verify response structure
-    assert "customer" in data, "Response should contain 'customer' key"
-    
-    # Verify customer structure
-    customer = data["customer"]
-    assert "id" in customer, "Customer should have 'id' field"
-    assert customer["id"] == customer_id, f"Customer ID should be {customer_id}"
-    assert "name" in customer, "Customer should have 'name' field"
-    assert "level" in customer, "Customer should have 'level' field"
-    
-    # Verify service level details are included
-    assert "levelDetails" in customer, "Customer should have 'levelDetails' field"
-    assert isinstance(customer["levelDetails"], dict), "'levelDetails' should be an object"
+    data = response_json(response)
     
-    # Verify service level details structure
-    level_details = customer["levelDetails"]
-    assert "level" in level_details, "Service level details should have 'level' field"
-    assert "allowed_actions" in level_details, "Service level details should have 'allowed_actions' field"
+    # Verify response structure, including service level details
+    validate_customer(data)
+    assert data["customer"]["id"] == customer_id, f"Customer ID should be {customer_id}"
 
 
-def test_get_customer_invalid_id():
+def test_get_customer_invalid_id(http):
     """
     Test the GET /customers/{customerId} endpoint with an invalid customer ID.
     
@@ -113,14 +96,14 @@ def test_get_customer_invalid_id():
     an invalid customer ID is provided.
     """
     # Make the API request with an invalid customer ID
-    response = requests.get(f"{REST_API_URL}/customers/invalid-customer-id")
+    response = http.get(CUSTOMER_URL.format("invalid-customer-id"))
     
     # Verify response status code
-    assert response.status_code == 404, f"Expected status code 404, got {response.status_code}: {response.text}"
+    check_status(response, 404)
     
     # Parse response body
-    data = response.json()
+    data = response_json(response)
     
     # Verify error message
-    assert "error" in data, "Response should contain 'error' key"
+    validate_error(data)
     assert "not found" in data["error"].lower(), "Error message should indicate customer not found" 
\ No newline at end of file
@@ -6,105 +6,112 @@ This module tests the devices API endpoints:
 - PATCH /customers/{customerId}/devices/{deviceId}
 """
 
-import os
-import sys
-import json
+import orjson
 import pytest
-import requests
-from pathlib import Path
 
-# Add the project root to the Python path so that imports work correctly
-project_root = Path(__file__).parent.parent.parent
-sys.path.insert(0, str(project_root))
-
-# Set environment variables for testing
-os.environ["ENVIRONMENT"] = "test"
+from tests.e2e._helpers import JSON_HEADERS, check_status, response_json, schema_validator
 
 # API URLs for testing
 REST_API_URL = "https://k4w64ym45e.execute-api.us-west-2.amazonaws.com/dev/api"
+DEVICES_URL = REST_API_URL + "/customers/{customer_id}/devices"
+DEVICE_URL = REST_API_URL + "/customers/{customer_id}/devices/{device_id}"
+
+# Update request body, encoded once
+POWER_ON_BODY = orjson.dumps({"power": "on"})
+
+# Response schemas, compiled once for every test in the module
+DEVICE_SCHEMA = {
+    "type": "object",
+    "required": ["id", "name", "type", "power"]
+}
+validate_devices = schema_validator({
+    "type": "object",
+    "required": ["devices"],
+    "properties": {"devices": {"type": "array", "items": DEVICE_SCHEMA}}
+})
+validate_device = schema_validator({
+    "type": "object",
+    "required": ["device"],
+    "properties": {"device": DEVICE_SCHEMA}
+})
 
 # Test data - these are now used as fallbacks if the fixture isn't available
 TEST_CUSTOMER_ID = "test-customer-e2e-d1a936e3"
 TEST_DEVICE_ID = "test-customer-e2e-d1a936e3-device-1"
 
-def test_get_devices(test_data):
+def test_get_devices(test_data, http):
     """Test the GET /customers/{customerId}/devices endpoint."""
     # Get customer ID from test data fixture
     customer_id = test_data['customer_id']
     
     # Make the API request
-    response = requests.get(
-        f"{REST_API_URL}/customers/{customer_id}/devices"
+    response = http.get(
+        DEVICES_URL.format(customer_id=customer_id)
     )
     
     # Verify response status code
-    assert response.status_code == 200, f"Expected status code 200, got {response.status_code}: {response.text}"
+    check_status(response, 200)
     
     # Parse response body
-    response_body = response.json()
+    response_body = response_json(response)
     
-    # Verify response structure
-    assert "devices" in response_body, "Response is missing devices array"
-    devices = response_body["devices"]
-    assert isinstance(devices, list), f"Expected devices to be a list, got {type(devices)}"
-    
-    # If there are devices, verify their structure
-    if devices:
-        device = devices[0]
-        assert "id" in device, "Device is missing id"
-        assert "name" in device, "Device is missing name"
-        assert "type" in device, "Device is missing type"
-        assert "power" in device, "Device is missing power"
+    # Verify response structure, including every device
+    validate_devices(response_body)
 
-def test_get_devices_invalid_customer():
-    """Test the GET /customers/{customerId}/devices endpoint with an invalid customer ID."""
-    # Make the API request
-    response = requests.get(
-        f"{REST_API_URL}/customers/invalid-customer-id/devices"
-    )
+@pytest.mark.parametrize("method,url,ids", [
+    pytest.param("GET", DEVICES_URL, {"customer_id": "invalid-customer-id"}, id="list-invalid-customer"),
+    pytest.param("PATCH", DEVICE_URL, {"customer_id": "invalid-customer-id"}, id="update-invalid-customer"),
+    pytest.param("PATCH", DEVICE_URL, {"device_id": "invalid-device-id"}, id="update-invalid-device")
+])
+def test_device_not_found(method, url, ids, test_data, http):
+    """
+    Test the devices endpoints with an invalid customer or device ID.
+    
+    The request goes to the test customer's device, with the IDs in `ids`
+    replaced by invalid ones; the endpoint should return a 404 error.
+    """
+    # Build the URL from the test data, overriding the invalid IDs
+    url = url.format(**{**test_data, **ids})
+    
+    # Make the API request; updates ask to turn the device on
+    body = POWER_ON_BODY if method == "PATCH" else None
+    response = http.request(method, url, data=body, headers=JSON_HEADERS)
     
     # Verify response status code
-    assert response.status_code == 404, f"Expected status code 404, got {response.status_code}: {response.text}"
+    check_status(response, 404)
 
-def test_update_device(test_data):
+def test_update_device(test_data, http):
     """Test the PATCH /customers/{customerId}/devices/{deviceId} endpoint."""
     # Get customer and device IDs from test data fixture
     customer_id = test_data['customer_id']
     device_id = test_data['device_id']  # Use the single device
     
-    # Prepare request body
-    request_body = {
-        "power": "on"
-    }
-    
-    # Make the API request
-    response = requests.patch(
-        f"{REST_API_URL}/customers/{customer_id}/devices/{device_id}",
-        json=request_body
+    # Make the API request to turn the device on
+    response = http.patch(
+        DEVICE_URL.format(customer_id=customer_id, device_id=device_id),
+        data=POWER_ON_BODY,
+        headers=JSON_HEADERS
     )
     
     # Verify response status code
-    assert response.status_code == 200, f"Expected status code 200, got {response.status_code}: {response.text}"
+    check_status(response, 200)
     
     # Parse response body
-    response_body = response.json()
+    response_body = response_json(response)
     
     # Verify response structure
-    assert "device" in response_body, "Response is missing device object"
+    validate_device(response_body)
     device = response_body["device"]
-    assert "id" in device, "Device is missing id"
-    assert "name" in device, "Device is missing name"
-    assert "type" in device, "Device is missing type"
-    assert "power" in device, "Device is missing power"
     
     # Verify the device status was updated
     assert device["power"] == "on", f"Expected device power to be 'on', got {device.get('power')}"
     
-    # Get the device list to verify the update
-    get_response = requests.get(
-        f"{REST_API_URL}/customers/{customer_id}/devices"
+    # Get the device list to verify the update was stored
+    get_response = http.get(
+        DEVICES_URL.format(customer_id=customer_id)
     )
-    get_response_body = get_response.json()
+    check_status(get_response, 200)
+    get_response_body = response_json(get_response)
     
     # Find the updated device in the list
     updated_device = next(
@@ -115,41 +122,3 @@ def test_update_device(test_data):
     # Verify the device was found and has the updated status
     assert updated_device is not None, f"Device {device_id} not found in device list"
     assert updated_device["power"] == "on", f"Expected device power to be 'on', got {updated_device.get('power')}"
-
-def test_update_device_invalid_customer(test_data):
-    """Test the PATCH /customers/{customerId}/devices/{deviceId} endpoint with an invalid customer ID."""
-    # Get device ID from test data fixture
-    device_id = test_data['device_id']  # Use the single device
-    
-    # Prepare request body
-    request_body = {
-        "power": "on"
-    }
-    
-    # Make the API request
-    response = requests.patch(
-        f"{REST_API_URL}/customers/invalid-customer-id/devices/{device_id}",
-        json=request_body
-    )
-    
-    # Verify response status code
-    assert response.status_code == 404, f"Expected status code 404, got {response.status_code}: {response.text}"
-
-def test_update_device_invalid_device(test_data):
-    """Test the PATCH /customers/{customerId}/devices/{deviceId} endpoint with an invalid device ID."""
-    # Get customer ID from test data fixture
-    customer_id = test_data['customer_id']
-    
-    # Prepare request body
-    request_body = {
-        'power': 'on'
-    }
-    
-    # Make the API request
-    response = requests.patch(
-        f"{REST_API_URL}/customers/{customer_id}/devices/invalid-device-id",
-        json=request_body
-    )
-    
-    # Verify response status code
-    assert response.status_code == 404, f"Expected status code 404, got {response.status_code}: {response.text}"
\ No newline at end of file
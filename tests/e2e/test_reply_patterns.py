@@ -0,0 +1,30 @@
+"""
+Tests for the patterns the chat action tests use to read chat replies.
+
+These run without the deployed API, so a pattern change is checked even when
+the end-to-end tests are skipped.
+"""
+
+import pytest
+
+from tests.e2e._helpers import says_power_on
+
+
+@pytest.mark.parametrize("reply,expected", [
+    ("i've turned on your speaker.", True),
+    ("your speaker is now on.", True),
+    ("the speaker is on and playing test song 1.", True),
+    ("your speaker is off.", False),
+    ("your speaker is not on.", False),
+    ("your speaker is not currently on.", False),
+    ("your speaker isn't on right now.", False),
+    ("your speaker isn’t turned on.", False),
+    ("your speaker is no longer on.", False),
+    ("I've turned off your speaker, so it is no longer on.", False),
+    ("the speaker in your location is off.", False),
+])
+def test_says_power_on(reply: str, expected: bool) -> None:
+    """
+    Test that negated power-on phrasings are not read as the device being on.
+    """
+    assert says_power_on(reply) is expected